@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AggregationConfig(AppConfig):
     name = 'aggregation'
+
+    def ready(self):
+        import aggregation.handlers
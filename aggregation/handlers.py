@@ -0,0 +1,107 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from djangoKnowledgeBase.routers import force_primary
+from djangoKnowledgeBase.versions import bump_version
+
+from . import summaries
+from .models import Author, Book, Publisher, Store
+
+REPORT_MODELS = (Author, Book, Publisher, Store)
+# 中间表的变化记到对应的主表上
+REPORT_THROUGH_MODELS = {
+    Book.authors.through: Book,
+    Store.books.through: Store,
+}
+
+
+# MARK: - 汇总表增量更新
+# 增量依赖读到的旧值，处理函数中的读取一律走主库，否则从库落后时会按旧数据计算。
+# Book.save()、delete()、关联管理器的 add/remove/clear 都在事务中发送这些信号，
+# 读旧值、写业务表与更新汇总表一起提交；QuerySet.update() 不发送信号，需要 rebuild_summaries
+@receiver(pre_save, sender=Book, dispatch_uid="book_summary_pre_save")
+@force_primary()
+def remember_old_book(sender, instance, raw=False, using=None, **kwargs):
+    instance._summary_old = None
+    if instance.pk is not None and not raw:
+        # 锁住旧行，并发修改同一本书时不会基于过期的旧值计算增量；
+        # SQLite 没有行锁，读过旧值的并发事务在写入时会因数据库锁失败回滚
+        old = (
+            Book.objects.using(using).select_for_update().filter(pk=instance.pk)
+            .values_list('publisher_id', 'price', 'rating').first()
+        )
+        if old is not None:
+            instance._summary_old = (old[0], summaries.to_decimal(old[1]), old[2])
+
+
+@receiver(post_save, sender=Book, dispatch_uid="book_summary_post_save")
+@force_primary()
+def update_book_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_summary_old', None)
+    if created or old is None:
+        summaries.book_added(instance)
+    else:
+        summaries.book_changed(instance, old)
+
+
+@receiver(pre_delete, sender=Book, dispatch_uid="book_summary_pre_delete")
+@force_primary()
+def remember_book_relations(sender, instance, **kwargs):
+    # 删除 Book 时中间表记录被级联删除，不会触发 m2m_changed，需提前记下
+    instance._summary_relations = (summaries.store_ids_of(instance.pk), summaries.author_ids_of(instance.pk))
+
+
+@receiver(post_delete, sender=Book, dispatch_uid="book_summary_post_delete")
+@force_primary()
+def remove_book_summary(sender, instance, **kwargs):
+    store_ids, author_ids = getattr(instance, '_summary_relations', ([], []))
+    summaries.book_removed(instance, store_ids, author_ids)
+
+
+@receiver(m2m_changed, sender=Book.authors.through, dispatch_uid="book_authors_summary")
+@force_primary()
+def update_author_summary(sender, instance, action, reverse, pk_set, **kwargs):
+    update_m2m(instance, action, reverse, pk_set, summaries.authors_changed, summaries.author_ids_of, 'book_set')
+
+
+@receiver(m2m_changed, sender=Store.books.through, dispatch_uid="store_books_summary")
+@force_primary()
+def update_store_summary(sender, instance, action, reverse, pk_set, **kwargs):
+    update_m2m(instance, action, reverse, pk_set, summaries.store_books_changed, summaries.store_ids_of, 'books')
+
+
+def update_m2m(instance, action, reverse, pk_set, apply, ids_of_book, related_name):
+    if action == 'post_add':
+        # post_add 的 pk_set 只包含新增的关联
+        apply(instance, reverse, pk_set, 1)
+    elif action == 'pre_remove':
+        # remove() 的 pk_set 可能包含本就不存在的关联，只保留实际会删除的部分
+        instance._summary_removed = related_ids(instance, ids_of_book, related_name) & set(pk_set)
+    elif action == 'post_remove':
+        apply(instance, reverse, getattr(instance, '_summary_removed', set()), -1)
+    elif action == 'pre_clear':
+        # clear() 的 pk_set 为空，先记下当前关联的 id
+        instance._summary_removed = related_ids(instance, ids_of_book, related_name)
+    elif action == 'post_clear':
+        apply(instance, reverse, getattr(instance, '_summary_removed', set()), -1)
+
+
+def related_ids(instance, ids_of_book, related_name):
+    if isinstance(instance, Book):
+        return set(ids_of_book(instance.pk))
+    return set(getattr(instance, related_name).values_list('pk', flat=True))
+
+
+# MARK: - 报表缓存版本号
+@receiver([post_save, post_delete], dispatch_uid="aggregation_table_version")
+def bump_table_version(sender, **kwargs):
+    if sender in REPORT_MODELS:
+        bump_version(sender)
+
+
+@receiver(m2m_changed, dispatch_uid="aggregation_m2m_version")
+def bump_m2m_version(sender, action, **kwargs):
+    if action.startswith('post_') and sender in REPORT_THROUGH_MODELS:
+        bump_version(REPORT_THROUGH_MODELS[sender])
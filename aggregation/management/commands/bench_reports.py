@@ -0,0 +1,109 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from djangoKnowledgeBase.benchmark import scratch_databases, timed, write_table
+
+# 0003_book_report_indexes 添加的索引，逐个单独测试
+CANDIDATE_INDEXES = {
+    'book_pubdate_idx': ('pubdate',),
+    'book_rating_idx': ('rating',),
+    'book_publisher_price_idx': ('publisher_id', 'price'),
+}
+
+
+class Command(BaseCommand):
+    help = '在大量 Book 数据上对比各候选索引对实时报表耗时的影响'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000000, help='书的数量')
+        parser.add_argument('--publishers', type=int, default=1000)
+        parser.add_argument('--authors', type=int, default=10000)
+        parser.add_argument('--stores', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def populate(self, options):
+        from aggregation.models import Author, Book, Publisher, Store
+
+        rng = random.Random(0)
+        Publisher.objects.bulk_create([Publisher(name='publisher {}'.format(i)) for i in range(options['publishers'])])
+        Author.objects.bulk_create([
+            Author(name='author {}'.format(i), age=rng.randint(20, 80)) for i in range(options['authors'])
+        ])
+        Store.objects.bulk_create([Store(name='store {}'.format(i)) for i in range(options['stores'])])
+        publisher_ids = list(Publisher.objects.values_list('id', flat=True))
+        author_ids = list(Author.objects.values_list('id', flat=True))
+        store_ids = list(Store.objects.values_list('id', flat=True))
+
+        first_day = date(2000, 1, 1)
+        batch = 10000
+        for start in range(0, options['books'], batch):
+            Book.objects.bulk_create([
+                Book(
+                    name='book {}'.format(i), pages=rng.randint(50, 1000),
+                    price=Decimal(rng.randint(100, 9999)) / 100, rating=rng.randint(10, 50) / 10,
+                    publisher_id=rng.choice(publisher_ids),
+                    pubdate=first_day + timedelta(days=rng.randrange(365 * 20)),
+                )
+                for i in range(start, min(start + batch, options['books']))
+            ])
+        book_ids = list(Book.objects.values_list('id', flat=True))
+
+        # 每本书 1-2 位作者；每家书店有 1% 的书
+        BookAuthor, StoreBook = Book.authors.through, Store.books.through
+        for start in range(0, len(book_ids), batch):
+            BookAuthor.objects.bulk_create([
+                BookAuthor(book_id=book_id, author_id=author_id)
+                for book_id in book_ids[start:start + batch]
+                for author_id in set(rng.choices(author_ids, k=rng.randint(1, 2)))
+            ])
+        per_store = max(1, len(book_ids) // 100)
+        for store_id in store_ids:
+            StoreBook.objects.bulk_create([
+                StoreBook(store_id=store_id, book_id=book_id) for book_id in rng.sample(book_ids, per_store)
+            ], batch_size=batch)
+
+    def run(self, options):
+        from aggregation import reports
+        from django.db import connection
+
+        self.populate(options)
+        self.stdout.write('已生成 {:,} 本书'.format(options['books']))
+
+        # 不经过 cached_report，每次都执行 SQL
+        recent = date(2019, 1, 1)
+        cases = [
+            ('store_inventory', reports.store_inventory),
+            ('publisher_price_distribution', reports.publisher_price_distribution),
+            ('author_productivity', reports.author_productivity),
+            ('author_productivity(since={})'.format(recent), lambda: reports.author_productivity(recent)),
+        ]
+
+        def measure():
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            return [timed(lambda: list(build()), repeat=options['repeat']) for _, build in cases]
+
+        with connection.cursor() as cursor:
+            for name in CANDIDATE_INDEXES:
+                cursor.execute('DROP INDEX IF EXISTS {}'.format(name))
+        columns = [measure()]
+        for name, fields in CANDIDATE_INDEXES.items():
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE INDEX {} ON aggregation_book ({})'.format(name, ', '.join(fields)))
+            columns.append(measure())
+            with connection.cursor() as cursor:
+                cursor.execute('DROP INDEX {}'.format(name))
+
+        rows = [
+            (name, *('{:.1f}'.format(ms) for ms in timings))
+            for (name, _), *timings in zip(cases, *columns)
+        ]
+        headers = ('report', 'no index ms', *('+{} ms'.format(name) for name in CANDIDATE_INDEXES))
+        write_table(self.stdout, headers, rows)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from aggregation import summaries
+from djangoKnowledgeBase.routers import force_primary
+
+
+class Command(BaseCommand):
+    help = '检查汇总表与业务表的聚合结果是否一致'
+
+    def handle(self, *args, **options):
+        # 从库可能落后，必须与主库中的业务表对比
+        with force_primary():
+            problems = summaries.check()
+        for model, pk, field, want, got in problems:
+            self.stdout.write('{} #{} {}: 应为 {}，实际为 {}'.format(model, pk, field, want, got))
+        if problems:
+            raise CommandError('发现 {} 处不一致，可执行 rebuild_summaries 修复'.format(len(problems)))
+        self.stdout.write(self.style.SUCCESS('汇总表与业务表一致'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from aggregation import summaries
+from djangoKnowledgeBase.routers import force_primary
+
+
+class Command(BaseCommand):
+    help = '根据业务表全量重建汇总表'
+
+    def handle(self, *args, **options):
+        # 从库可能落后，必须按主库中的业务表重建
+        with force_primary():
+            publishers, stores, authors = summaries.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            '重建完成：出版社 {}，书店 {}，作者 {}'.format(publishers, stores, authors)
+        ))
@@ -0,0 +1,70 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def build_summaries(apps, schema_editor):
+    # 为已有数据生成汇总行，之后由信号增量维护
+    Publisher = apps.get_model('aggregation', 'Publisher')
+    Store = apps.get_model('aggregation', 'Store')
+    Author = apps.get_model('aggregation', 'Author')
+    PublisherSummary = apps.get_model('aggregation', 'PublisherSummary')
+    StoreSummary = apps.get_model('aggregation', 'StoreSummary')
+    AuthorSummary = apps.get_model('aggregation', 'AuthorSummary')
+
+    PublisherSummary.objects.bulk_create([
+        PublisherSummary(
+            publisher_id=row['pk'],
+            book_count=row['book_count'],
+            price_sum=row['price_sum'] or 0,
+            rating_sum=row['rating_sum'] or 0,
+        )
+        for row in Publisher.objects.values('pk').annotate(
+            book_count=Count('book'), price_sum=Sum('book__price'), rating_sum=Sum('book__rating'),
+        )
+    ])
+    StoreSummary.objects.bulk_create([
+        StoreSummary(store_id=row['pk'], book_count=row['book_count'], total_price=row['total_price'] or 0)
+        for row in Store.objects.values('pk').annotate(book_count=Count('books'), total_price=Sum('books__price'))
+    ])
+    AuthorSummary.objects.bulk_create([
+        AuthorSummary(author_id=row['pk'], book_count=row['book_count'])
+        for row in Author.objects.values('pk').annotate(book_count=Count('book'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aggregation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorSummary',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='aggregation.author')),
+                ('book_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PublisherSummary',
+            fields=[
+                ('publisher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='aggregation.publisher')),
+                ('book_count', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('rating_sum', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StoreSummary',
+            fields=[
+                ('store', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='aggregation.store')),
+                ('book_count', models.IntegerField(default=0)),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
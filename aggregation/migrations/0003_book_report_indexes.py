@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aggregation', '0002_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publisher', 'price'], name='book_publisher_price_idx'),
+        ),
+    ]
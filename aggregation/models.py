@@ -1,4 +1,6 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, router, transaction
 from django.http import JsonResponse
 
 class Author(models.Model):
@@ -25,9 +27,23 @@ class Book(models.Model):
     publisher = models.ForeignKey(Publisher, on_delete=models.CASCADE)
     pubdate = models.DateField()
 
+    class Meta:
+        # publisher 外键本身已有索引，(publisher, price) 让价格分布报表可走覆盖索引。
+        # pubdate、rating 单列索引不被任何报表使用（见 python manage.py bench_reports），不再保留
+        indexes = [
+            models.Index(fields=['publisher', 'price'], name='book_publisher_price_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # pre_save 读旧值、写入本行、post_save 更新汇总表放在同一事务中，
+        # 汇总表的增量与本行的修改一起提交或回滚
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
 
 class Store(models.Model):
     name = models.CharField(max_length=300)
@@ -35,3 +51,31 @@ class Store(models.Model):
 
     def __str__(self):
         return self.name
+
+
+# MARK: - 汇总表
+# 由 aggregation.summaries 通过信号增量维护，报表直接读取这些表
+class PublisherSummary(models.Model):
+    publisher = models.OneToOneField(Publisher, primary_key=True, on_delete=models.CASCADE, related_name='summary')
+    book_count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    rating_sum = models.FloatField(default=0)
+
+    @property
+    def avg_price(self):
+        return (self.price_sum / self.book_count).quantize(Decimal('0.01')) if self.book_count else None
+
+    @property
+    def avg_rating(self):
+        return self.rating_sum / self.book_count if self.book_count else None
+
+
+class StoreSummary(models.Model):
+    store = models.OneToOneField(Store, primary_key=True, on_delete=models.CASCADE, related_name='summary')
+    book_count = models.IntegerField(default=0)
+    total_price = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+
+class AuthorSummary(models.Model):
+    author = models.OneToOneField(Author, primary_key=True, on_delete=models.CASCADE, related_name='summary')
+    book_count = models.IntegerField(default=0)
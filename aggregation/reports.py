@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Max, Min, OuterRef, Q, Subquery, Sum, Window
+from django.db.models.functions import Rank
+
+from djangoKnowledgeBase.routers import force_primary
+from djangoKnowledgeBase.versions import table_versions
+
+from .models import Author, Book, Publisher, Store
+
+
+def cached_report(name, models, params, build):
+    """
+    按报表名、参数及相关表版本号缓存报表结果。
+    build() 返回 queryset，DEBUG 模式下附带 SQLite 的 EXPLAIN QUERY PLAN。
+    """
+    versions = table_versions(models)
+    key = 'aggregation:report:{}:{}:{}'.format(name, versions, params)
+    result = cache.get(key)
+    if result is None:
+        # 版本号在主库写入后立即更新，此时从库可能尚未同步；
+        # 从主库读取，避免把旧数据存到新版本号下
+        with force_primary():
+            queryset = build()
+            result = {'results': list(queryset)}
+            if settings.DEBUG:
+                result['plan'] = queryset.explain()
+        cache.set(key, result)
+    return result
+
+
+# MARK: - 报表
+def store_inventory():
+    # 每家书店的库存总价值及排名，一条 SQL 完成
+    return Store.objects.values('id', 'name').annotate(
+        book_count=Count('books'),
+        inventory_value=Sum('books__price'),
+        rank=Window(Rank(), order_by=F('inventory_value').desc()),
+    ).order_by('rank', 'id')
+
+
+def publisher_price_distribution():
+    # 每家出版社的价格分布，价格区间用带 filter 的 Count 一次统计
+    return Publisher.objects.values('id', 'name').annotate(
+        book_count=Count('book'),
+        min_price=Min('book__price'),
+        max_price=Max('book__price'),
+        avg_price=Avg('book__price'),
+        under_20=Count('book', filter=Q(book__price__lt=20)),
+        from_20_to_50=Count('book', filter=Q(book__price__gte=20, book__price__lt=50)),
+        over_50=Count('book', filter=Q(book__price__gte=50)),
+    ).order_by('id')
+
+
+class GroupedSubquery(Subquery):
+    """
+    只引用外层分组列的关联子查询，不加入 GROUP BY。
+    Django 默认把子查询放进 GROUP BY，SQLite 会在分组前对每个 JOIN 行执行一次，
+    耗时随每组的行数平方增长；不参与分组时每组只执行一次。
+    """
+
+    def get_group_by_cols(self, alias=None):
+        return []
+
+
+def author_productivity(since=None):
+    books = Book.objects.all()
+    book_filter = Q()
+    if since is not None:
+        books = books.filter(pubdate__gte=since)
+        book_filter = Q(book__pubdate__gte=since)
+
+    # 评分最高的一本书，以关联子查询取得
+    top_book = books.filter(authors=OuterRef('pk')).order_by('-rating', 'id').values('name')[:1]
+    return Author.objects.values('id', 'name').annotate(
+        book_count=Count('book', filter=book_filter),
+        avg_rating=Avg('book__rating', filter=book_filter),
+        latest_pubdate=Max('book__pubdate', filter=book_filter),
+        top_book=GroupedSubquery(top_book),
+        rank=Window(Rank(), order_by=F('book_count').desc()),
+    ).order_by('rank', 'id')
@@ -0,0 +1,151 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import (
+    Author, Publisher, Book, Store,
+    PublisherSummary, StoreSummary, AuthorSummary,
+)
+
+
+# MARK: - 增量更新
+def to_decimal(value):
+    return Decimal(str(value))
+
+
+def bump(model, keys, **deltas):
+    """
+    对 keys 对应的汇总行做 F() 增量更新；增量为正且汇总行不存在时先创建。
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    key_field = model._meta.pk.attname
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    updated = model.objects.filter(**{key_field + '__in': keys}).update(**changes)
+    if updated < len(keys) and any(delta > 0 for delta in deltas.values()):
+        existing = set(model.objects.filter(**{key_field + '__in': keys}).values_list(key_field, flat=True))
+        model.objects.bulk_create(
+            [model(**{key_field: key, **deltas}) for key in keys if key not in existing],
+            ignore_conflicts=True,
+        )
+
+
+def store_ids_of(book_id):
+    return list(Store.books.through.objects.filter(book_id=book_id).values_list('store_id', flat=True))
+
+
+def author_ids_of(book_id):
+    return list(Book.authors.through.objects.filter(book_id=book_id).values_list('author_id', flat=True))
+
+
+def book_added(book):
+    bump(PublisherSummary, [book.publisher_id], book_count=1, price_sum=to_decimal(book.price), rating_sum=book.rating)
+
+
+def book_changed(book, old):
+    old_publisher_id, old_price, old_rating = old
+    price, rating = to_decimal(book.price), book.rating
+    if old_publisher_id != book.publisher_id:
+        bump(PublisherSummary, [old_publisher_id], book_count=-1, price_sum=-old_price, rating_sum=-old_rating)
+        bump(PublisherSummary, [book.publisher_id], book_count=1, price_sum=price, rating_sum=rating)
+    elif price != old_price or rating != old_rating:
+        bump(PublisherSummary, [book.publisher_id], price_sum=price - old_price, rating_sum=rating - old_rating)
+
+    if price != old_price:
+        bump(StoreSummary, store_ids_of(book.pk), total_price=price - old_price)
+
+
+def book_removed(book, store_ids, author_ids):
+    price = to_decimal(book.price)
+    bump(PublisherSummary, [book.publisher_id], book_count=-1, price_sum=-price, rating_sum=-book.rating)
+    bump(StoreSummary, store_ids, book_count=-1, total_price=-price)
+    bump(AuthorSummary, author_ids, book_count=-1)
+
+
+def authors_changed(instance, reverse, pk_set, sign):
+    if reverse:
+        # instance 为 Author，pk_set 为 Book 的 id
+        bump(AuthorSummary, [instance.pk], book_count=sign * len(pk_set))
+    else:
+        # instance 为 Book，pk_set 为 Author 的 id
+        bump(AuthorSummary, pk_set, book_count=sign)
+
+
+def store_books_changed(instance, reverse, pk_set, sign):
+    if reverse:
+        # instance 为 Book，pk_set 为 Store 的 id
+        bump(StoreSummary, pk_set, book_count=sign, total_price=sign * to_decimal(instance.price))
+    else:
+        # instance 为 Store，pk_set 为 Book 的 id
+        total = Book.objects.filter(pk__in=pk_set).aggregate(total=Sum('price'))['total'] or 0
+        bump(StoreSummary, [instance.pk], book_count=sign * len(pk_set), total_price=sign * total)
+
+
+# MARK: - 全量重建
+def compute_summaries():
+    """
+    直接从业务表聚合出汇总数据，每张汇总表一条查询。
+    """
+    publishers = {
+        row['pk']: PublisherSummary(
+            publisher_id=row['pk'],
+            book_count=row['book_count'],
+            price_sum=row['price_sum'] or 0,
+            rating_sum=row['rating_sum'] or 0,
+        )
+        for row in Publisher.objects.values('pk').annotate(
+            book_count=Count('book'), price_sum=Sum('book__price'), rating_sum=Sum('book__rating'),
+        )
+    }
+    stores = {
+        row['pk']: StoreSummary(
+            store_id=row['pk'],
+            book_count=row['book_count'],
+            total_price=row['total_price'] or 0,
+        )
+        for row in Store.objects.values('pk').annotate(
+            book_count=Count('books'), total_price=Sum('books__price'),
+        )
+    }
+    authors = {
+        row['pk']: AuthorSummary(author_id=row['pk'], book_count=row['book_count'])
+        for row in Author.objects.values('pk').annotate(book_count=Count('book'))
+    }
+    return publishers, stores, authors
+
+
+def rebuild():
+    # 在同一事务中聚合并写入，事务中的读取走主库
+    with transaction.atomic():
+        publishers, stores, authors = compute_summaries()
+        for model, rows in ((PublisherSummary, publishers), (StoreSummary, stores), (AuthorSummary, authors)):
+            model.objects.all().delete()
+            model.objects.bulk_create(rows.values(), batch_size=500)
+    return len(publishers), len(stores), len(authors)
+
+
+def check():
+    """
+    对比汇总表与实时聚合结果，返回不一致的记录列表。
+    """
+    problems = []
+    expected = compute_summaries()
+    fields = {
+        PublisherSummary: ('book_count', 'price_sum', 'rating_sum'),
+        StoreSummary: ('book_count', 'total_price'),
+        AuthorSummary: ('book_count',),
+    }
+    for (model, names), rows in zip(fields.items(), expected):
+        actual = {obj.pk: obj for obj in model.objects.all()}
+        for pk, row in rows.items():
+            obj = actual.pop(pk, None)
+            for name in names:
+                want = getattr(row, name)
+                got = getattr(obj, name) if obj is not None else 0
+                if abs(float(want) - float(got)) > 1e-6:
+                    problems.append((model.__name__, pk, name, want, got))
+        for pk in actual:
+            problems.append((model.__name__, pk, 'orphan', None, None))
+    return problems
@@ -1,3 +1,173 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from . import summaries
+from .models import (
+    Author, Book, Publisher, Store,
+    AuthorSummary, PublisherSummary, StoreSummary,
+)
+
+
+# MARK: - 汇总表
+class SummaryTestMixin:
+    def setUp(self):
+        self.publishers = [Publisher.objects.create(name='publisher-{}'.format(i)) for i in range(2)]
+        self.authors = [Author.objects.create(name='author-{}'.format(i), age=30 + i) for i in range(3)]
+        self.stores = [Store.objects.create(name='store-{}'.format(i)) for i in range(2)]
+
+    def make_book(self, price='10.00', rating=4.0, publisher=0):
+        return Book.objects.create(
+            name='book', pages=100, price=Decimal(price), rating=rating,
+            publisher=self.publishers[publisher], pubdate=date(2020, 1, 1),
+        )
+
+    def assertSummariesMatch(self):
+        """汇总表与直接 aggregate() 的结果一致；没有书的对象汇总值为 0"""
+        for publisher in Publisher.objects.all():
+            expected = Book.objects.filter(publisher=publisher).aggregate(
+                book_count=Count('id'), price_sum=Sum('price'), rating_sum=Sum('rating'),
+            )
+            summary = PublisherSummary.objects.filter(pk=publisher.pk).first() or PublisherSummary()
+            self.assertEqual(summary.book_count, expected['book_count'], publisher)
+            self.assertEqual(Decimal(summary.price_sum), expected['price_sum'] or 0, publisher)
+            self.assertAlmostEqual(summary.rating_sum, expected['rating_sum'] or 0, msg=publisher)
+        for store in Store.objects.all():
+            expected = store.books.aggregate(book_count=Count('id'), total_price=Sum('price'))
+            summary = StoreSummary.objects.filter(pk=store.pk).first() or StoreSummary()
+            self.assertEqual(summary.book_count, expected['book_count'], store)
+            self.assertEqual(Decimal(summary.total_price), expected['total_price'] or 0, store)
+        for author in Author.objects.all():
+            summary = AuthorSummary.objects.filter(pk=author.pk).first() or AuthorSummary()
+            self.assertEqual(summary.book_count, author.book_set.count(), author)
+        self.assertEqual(summaries.check(), [])
+
+
+class SummaryTests(SummaryTestMixin, TestCase):
+    def test_save(self):
+        book = self.make_book()
+        self.make_book(price='5.50', rating=3.0)
+        self.assertSummariesMatch()
+
+        book.price, book.rating = Decimal('12.25'), 5.0
+        book.save()
+        self.assertSummariesMatch()
+
+        book.publisher = self.publishers[1]
+        book.save()
+        self.assertSummariesMatch()
+
+    def test_price_change_updates_stores(self):
+        book = self.make_book()
+        book.store_set.add(*self.stores)
+        book.price = Decimal('30.00')
+        book.save()
+        self.assertSummariesMatch()
+
+    def test_delete(self):
+        book = self.make_book()
+        book.authors.add(*self.authors)
+        book.store_set.add(self.stores[0])
+        self.make_book(price='7.00')
+        book.delete()
+        self.assertSummariesMatch()
+
+    def test_m2m_add_remove_clear(self):
+        books = [self.make_book(price=str(10 + i)) for i in range(3)]
+
+        books[0].authors.add(self.authors[0], self.authors[1])
+        # 重复添加、删除不存在的关联都不影响计数
+        books[0].authors.add(self.authors[0])
+        books[0].authors.remove(self.authors[2])
+        self.authors[2].book_set.add(*books)
+        self.stores[0].books.add(*books)
+        books[1].store_set.add(self.stores[1])
+        self.assertSummariesMatch()
+
+        books[0].authors.remove(self.authors[1])
+        self.stores[0].books.remove(books[2])
+        books[1].store_set.remove(self.stores[1])
+        self.assertSummariesMatch()
+
+        books[0].authors.clear()
+        self.authors[2].book_set.clear()
+        self.stores[0].books.clear()
+        self.assertSummariesMatch()
+
+
+
+class SummaryAtomicityTests(SummaryTestMixin, TransactionTestCase):
+    # 不在 TestCase 的外层事务中运行，才能看出 save() 本身是否在事务中
+    def test_failed_summary_update_rolls_back_the_row(self):
+        book = self.make_book()
+        book.price = Decimal('99.00')
+        with mock.patch.object(summaries, 'book_changed', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                book.save()
+        # 汇总表更新失败时，本行的修改一起回滚
+        self.assertEqual(Book.objects.get(pk=book.pk).price, Decimal('10.00'))
+        self.assertSummariesMatch()
+
+
+# MARK: - 报表缓存
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.publisher = Publisher.objects.create(name='publisher')
+        self.author = Author.objects.create(name='author', age=40)
+        self.store = Store.objects.create(name='store')
+        self.book = Book.objects.create(
+            name='book', pages=100, price=Decimal('10.00'), rating=4.0,
+            publisher=self.publisher, pubdate=date(2020, 1, 1),
+        )
+
+    def report(self, name, **params):
+        return self.client.get(reverse('aggregation:' + name), params).json()['results']
+
+    def assertCached(self, name, **params):
+        with self.assertNumQueries(0):
+            return self.report(name, **params)
+
+    def test_hit_runs_no_queries(self):
+        first = self.report('publisher_price')
+        self.assertEqual(self.assertCached('publisher_price'), first)
+        # 参数不同，缓存分开
+        self.book.authors.add(self.author)
+        self.assertEqual(self.report('author_productivity', since='2021-01-01')[0]['book_count'], 0)
+        self.assertEqual(self.report('author_productivity')[0]['book_count'], 1)
+
+    def test_book_save_and_delete_invalidate(self):
+        self.report('publisher_price')
+        self.book.price = Decimal('60.00')
+        self.book.save()
+        row, = self.report('publisher_price')
+        self.assertEqual((row['under_20'], row['over_50']), (0, 1))
+
+        self.book.delete()
+        row, = self.report('publisher_price')
+        self.assertEqual(row['book_count'], 0)
+
+    def test_m2m_changes_invalidate(self):
+        self.assertEqual(self.report('store_inventory')[0]['book_count'], 0)
+        self.store.books.add(self.book)
+        self.assertEqual(self.report('store_inventory')[0]['book_count'], 1)
+        self.assertCached('store_inventory')
+
+        self.assertEqual(self.report('author_productivity')[0]['book_count'], 0)
+        self.book.authors.add(self.author)
+        row, = self.report('author_productivity')
+        self.assertEqual((row['book_count'], row['top_book']), (1, 'book'))
+        self.book.authors.clear()
+        self.assertEqual(self.report('author_productivity')[0]['book_count'], 0)
+
+    def test_unrelated_write_keeps_cache(self):
+        self.report('publisher_price')
+        self.store.name = 'renamed'
+        self.store.save()
+        self.assertCached('publisher_price')
@@ -0,0 +1,21 @@
+from django.urls import path
+from .views import (
+    publisher_report,
+    store_report,
+    author_report,
+    store_inventory_report,
+    publisher_price_report,
+    author_productivity_report,
+)
+
+app_name = 'aggregation'
+
+urlpatterns = [
+    path('publishers/', publisher_report, name='publishers'),
+    path('stores/', store_report, name='stores'),
+    path('authors/', author_report, name='authors'),
+
+    path('reports/store-inventory/', store_inventory_report, name='store_inventory'),
+    path('reports/publisher-price/', publisher_price_report, name='publisher_price'),
+    path('reports/author-productivity/', author_productivity_report, name='author_productivity'),
+]
@@ -1,3 +1,62 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.utils.dateparse import parse_date
 
-# Create your views here.
+from . import reports
+from .models import Author, Book, Publisher, Store, PublisherSummary, StoreSummary, AuthorSummary
+
+
+# MARK: - 汇总报表
+# 只读取汇总表，不对 Book 及中间表做聚合
+def publisher_report(request):
+    rows = PublisherSummary.objects.select_related('publisher').order_by('-book_count')
+    return JsonResponse({'results': [
+        {
+            'publisher': row.publisher.name,
+            'book_count': row.book_count,
+            'avg_price': row.avg_price,
+            'avg_rating': row.avg_rating,
+        }
+        for row in rows
+    ]})
+
+
+def store_report(request):
+    rows = StoreSummary.objects.select_related('store').order_by('-total_price')
+    return JsonResponse({'results': [
+        {'store': row.store.name, 'book_count': row.book_count, 'total_price': row.total_price}
+        for row in rows
+    ]})
+
+
+def author_report(request):
+    rows = AuthorSummary.objects.select_related('author').order_by('-book_count')
+    return JsonResponse({'results': [
+        {'author': row.author.name, 'book_count': row.book_count}
+        for row in rows
+    ]})
+
+
+# MARK: - 实时报表
+# 每个报表一条 SQL，结果按相关表的版本号缓存
+def store_inventory_report(request):
+    result = reports.cached_report('store_inventory', (Store, Book), '', reports.store_inventory)
+    return JsonResponse(result)
+
+
+def publisher_price_report(request):
+    result = reports.cached_report(
+        'publisher_price', (Publisher, Book), '', reports.publisher_price_distribution,
+    )
+    return JsonResponse(result)
+
+
+def author_productivity_report(request):
+    try:
+        since = parse_date(request.GET.get('since', ''))
+    except ValueError:
+        since = None
+    result = reports.cached_report(
+        'author_productivity', (Author, Book), since,
+        lambda: reports.author_productivity(since),
+    )
+    return JsonResponse(result)
@@ -14,10 +14,19 @@ class ImageAdmin(admin.ModelAdmin):
     list_display = ('image', 'admin_image')
 
 
+# 列表页只读取冗余的作者名，不逐行查询用户与群组
+class OwnerAdmin(admin.ModelAdmin):
+    list_display = ('display_name', 'person_id', 'group_id')
+
+
+class PostAdmin(admin.ModelAdmin):
+    list_display = ('title', 'owner_display_name', 'created', 'views')
+
+
 admin.site.register(MyUser, MyUserAdmin)
-admin.site.register(Post)
+admin.site.register(Post, PostAdmin)
 admin.site.register(UUIDModel)
-admin.site.register(Owner)
+admin.site.register(Owner, OwnerAdmin)
 admin.site.register(Group)
 admin.site.register(Person)
 admin.site.register(Human)
@@ -1,5 +1,14 @@
+import atexit
+
 from django.apps import AppConfig
 
 
 class DemoConfig(AppConfig):
     name = 'demo'
+
+    def ready(self):
+        import demo.checks
+        import demo.handlers
+        from .counters import view_counter
+        # 进程退出时刷新尚未写入的阅读量
+        atexit.register(view_counter.shutdown)
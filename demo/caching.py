@@ -0,0 +1,93 @@
+import functools
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_cache_key, learn_cache_key
+
+from djangoKnowledgeBase.routers import force_primary
+from djangoKnowledgeBase.versions import table_versions
+
+# 数据变化时需要更新版本号的模型，页面与模板片段的缓存 key 中带上它们的版本号
+VERSIONED_MODELS = ('demo.Post', 'demo.Person', 'demo.Owner', 'demo.Group', settings.AUTH_USER_MODEL)
+
+
+def model_versions(labels):
+    return table_versions([apps.get_model(label) for label in labels])
+
+
+# MARK: - 命中率统计
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, hit):
+        with self._lock:
+            stats = self._stats.setdefault(name, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: dict(stats, ratio=round(stats['hits'] / (stats['hits'] + stats['misses']), 3))
+                for name, stats in self._stats.items()
+            }
+
+
+page_stats = CacheStats()
+fragment_stats = CacheStats()
+
+
+# MARK: - 整页缓存
+def cache_page_for_anonymous(models, timeout=None, vary_on_csrf=False):
+    """
+    只为匿名用户的 GET / HEAD 请求缓存整个响应。
+
+    key 中带上 models 的版本号，数据变化后自动失效；
+    视图自己设置的 Vary 头由 learn_cache_key() 记录。
+    页面中含有 {% csrf_token %} 时需设置 vary_on_csrf，按 CSRF Cookie 分别缓存，
+    尚无 CSRF Cookie 的请求不缓存（否则会把新生成的 token 发给别人）。
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            name = request.resolver_match.view_name if request.resolver_match else request.path
+            csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+            key_prefix = 'demo:page:{}'.format(model_versions(models))
+            if vary_on_csrf:
+                key_prefix = '{}:{}'.format(key_prefix, csrf_cookie)
+
+            cache_key = get_cache_key(request, key_prefix, 'GET', cache=cache)
+            response = cache.get(cache_key) if cache_key else None
+            page_stats.record(name, response is not None)
+            if response is not None:
+                response['X-Page-Cache'] = 'hit'
+                return response
+
+            # 版本号在主库写入后立即更新，从库可能尚未同步；
+            # 要缓存的页面从主库读取（包括 TemplateResponse 的延迟渲染），避免把旧数据存到新版本号下
+            with force_primary():
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+            cacheable = (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and not (vary_on_csrf and csrf_cookie is None)
+            )
+            if cacheable:
+                cache_key = learn_cache_key(request, response, timeout, key_prefix, cache=cache)
+                cache.set(cache_key, response, timeout)
+            response['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
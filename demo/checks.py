@@ -0,0 +1,19 @@
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+
+from . import search
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, databases=None, **kwargs):
+    """python manage.py check --database default：全文索引的同步触发器是否齐全"""
+    errors = []
+    for alias in databases or []:
+        missing = search.missing_triggers(connections[alias])
+        if missing:
+            errors.append(Warning(
+                '数据库 {} 缺少全文索引同步触发器：{}'.format(alias, ', '.join(missing)),
+                hint='执行 python manage.py rebuild_search_index --database {}'.format(alias),
+                id='demo.W001',
+            ))
+    return errors
@@ -0,0 +1,62 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from .caching import model_versions
+from .models import Post
+
+# 详情页中作者名来自这些模型
+OWNER_MODELS = ('demo.Owner', 'demo.Group', settings.AUTH_USER_MODEL)
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+# MARK: - 文章详情
+def conditional_post(queryset=None):
+    """
+    根据 Post.updated 支持条件请求（ETag / Last-Modified），未变化时直接返回 304。
+
+    只读取 updated 一列（按主键查找），不取整行、不渲染模板。
+    阅读量不在 HTML 中计数，而是由页面加载后发送的 beacon 请求累加。
+    """
+
+    def probe(request, id, **kwargs):
+        # etag_func 与 last_modified_func 共用一次查询
+        if not hasattr(request, '_post_updated'):
+            qs = Post.objects.all() if queryset is None else queryset
+            request._post_updated = qs.filter(pk=id).order_by().values_list('updated', flat=True).first()
+        return request._post_updated
+
+    def etag(request, id, **kwargs):
+        updated = probe(request, id)
+        if updated is None:
+            return None
+        return make_etag('post', id, updated.timestamp(), model_versions(OWNER_MODELS))
+
+    def last_modified(request, id, **kwargs):
+        return probe(request, id)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+# MARK: - 首页文章列表
+def listing_etag(request, *args, **kwargs):
+    """
+    首页的 ETag：文章的 max(updated) 与 count（索引上一次聚合完成），
+    再加上游标、Person 版本号与 CSRF Cookie（页面表单中含有 csrf token）。
+    """
+    state = Post.objects.order_by().aggregate(last=Max('updated'), count=Count('pk'))
+    last = state['last'].timestamp() if state['last'] else 0
+    return make_etag(
+        'posts', last, state['count'],
+        request.GET.get('cursor', ''),
+        model_versions(('demo.Person',)),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+
+
+conditional_listing = condition(etag_func=listing_etag)
@@ -0,0 +1,129 @@
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Case, When, F, Value, IntegerField
+
+
+# MARK: - 缓冲计数器
+class ViewCounter:
+    """
+    进程内的阅读量计数器。
+
+    每次访问只在内存中累加，按时间间隔或累计数量批量刷入数据库，
+    避免热门文章的每一次访问都触发一条 UPDATE 语句。
+    """
+
+    def __init__(self, model, field, shards=16, flush_interval=5.0, flush_size=500, batch_size=200):
+        self.model_label = model
+        self.field = field
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.batch_size = batch_size
+
+        # 分片计数，降低多线程下的锁竞争
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._totals = [0] * shards
+
+        self._flush_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._worker = None
+        self._stopped = threading.Event()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def _index(self, pk):
+        return hash(pk) % len(self._shards)
+
+    def incr(self, pk, n=1):
+        i = self._index(pk)
+        with self._locks[i]:
+            self._shards[i][pk] = self._shards[i].get(pk, 0) + n
+            self._totals[i] += n
+
+        self._ensure_worker()
+        if sum(self._totals) >= self.flush_size:
+            self.flush(blocking=False)
+
+    def pending(self, pk):
+        i = self._index(pk)
+        with self._locks[i]:
+            return self._shards[i].get(pk, 0)
+
+    def _drain(self):
+        drained = {}
+        for i, shard in enumerate(self._shards):
+            with self._locks[i]:
+                for pk, n in shard.items():
+                    drained[pk] = drained.get(pk, 0) + n
+                shard.clear()
+                self._totals[i] = 0
+        return drained
+
+    def _restore(self, counts):
+        for pk, n in counts.items():
+            i = self._index(pk)
+            with self._locks[i]:
+                self._shards[i][pk] = self._shards[i].get(pk, 0) + n
+                self._totals[i] += n
+
+    def flush(self, blocking=True):
+        """
+        将所有未持久化的计数写入数据库，返回写入的行数。
+
+        每批生成一条 UPDATE ... SET views = CASE WHEN id = 1 THEN views + 3 ... END 语句。
+        """
+        if not self._flush_lock.acquire(blocking):
+            return 0
+        try:
+            drained = self._drain()
+            items = list(drained.items())
+            updated = 0
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                whens = [When(pk=pk, then=F(self.field) + Value(n)) for pk, n in batch]
+                try:
+                    updated += self.model._base_manager.filter(
+                        pk__in=[pk for pk, _ in batch]
+                    ).update(**{
+                        self.field: Case(*whens, default=F(self.field), output_field=IntegerField())
+                    })
+                except Exception:
+                    # 写入失败时把剩余计数放回缓冲区，等待下次刷新
+                    self._restore(dict(items[start:]))
+                    raise
+            return updated
+        finally:
+            self._flush_lock.release()
+
+    def _ensure_worker(self):
+        if self._worker is not None or self.flush_interval is None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # 数据库暂时不可用时，计数保留在内存中
+                pass
+
+    def shutdown(self):
+        # 进程退出前把剩余的计数写回数据库
+        self._stopped.set()
+        self.flush()
+
+
+view_counter = ViewCounter(
+    'demo.Post',
+    'views',
+    flush_interval=getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 5.0),
+    flush_size=getattr(settings, 'VIEW_COUNTER_FLUSH_SIZE', 500),
+)
@@ -0,0 +1,110 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image as PILImage
+
+from .models import Image
+
+
+# MARK: - 缩略图
+# 字段名: 最大宽度
+VARIANTS = {
+    'thumbnail': 320,
+    'medium': 960,
+}
+
+# Pillow 未编译 WebP 支持时退回 JPEG
+PILImage.init()
+VARIANT_FORMAT = 'WEBP' if 'WEBP' in PILImage.SAVE else 'JPEG'
+VARIANT_EXT = '.webp' if VARIANT_FORMAT == 'WEBP' else '.jpg'
+
+
+def render_variants(source, targets):
+    """
+    在进程池中执行：读取原图，按 targets {文件路径: 最大宽度} 生成缩略图。
+    """
+    with PILImage.open(source) as original:
+        original = original.convert('RGB')
+        for path, width in targets.items():
+            variant = original.copy()
+            variant.thumbnail((width, width * 4))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            variant.save(path, VARIANT_FORMAT, quality=80)
+
+
+def variant_names(image):
+    """
+    计算各缩略图在 storage 中的文件名，返回 {字段名: 文件名}。
+
+    文件名中带上图片主键：get_available_name() 只检查已存在的文件，
+    同一批中不同日期上传的同名原图会得到相同的名字，互相覆盖。
+    """
+    storage = image.image.storage
+    stem = os.path.splitext(os.path.basename(image.image.name))[0]
+    names = {}
+    for field_name, width in VARIANTS.items():
+        field = Image._meta.get_field(field_name)
+        filename = '{}_{}_{}{}'.format(stem, image.pk, width, VARIANT_EXT)
+        names[field_name] = storage.get_available_name(field.generate_filename(image, filename))
+    return names
+
+
+def claimable(lease):
+    """
+    可以领取的图片：待处理的，以及处理中但租期已过（worker 已退出）的。
+    """
+    expired = timezone.now() - timedelta(seconds=lease)
+    return Q(variant_status=Image.PENDING) | Q(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired),
+        variant_status=Image.PROCESSING,
+    )
+
+
+def claim_pending(limit, lease=None):
+    """
+    领取待处理的图片：把状态改为 processing 并记下领取时间，返回领取成功的图片。
+    数据库即任务队列，多个 worker 同时运行时只有一个能领取到同一张图片；
+    正在处理、租期未过的图片不会被其他 worker 领走。
+    """
+    if lease is None:
+        lease = getattr(settings, 'IMAGE_CLAIM_LEASE', 600)
+    ids = list(Image.objects.filter(claimable(lease)).order_by('id').values_list('id', flat=True)[:limit])
+    claimed = []
+    for pk in ids:
+        with transaction.atomic():
+            # 条件更新：两个 worker 同时领取时只有一个能更新成功
+            updated = Image.objects.filter(claimable(lease), pk=pk).update(
+                variant_status=Image.PROCESSING, claimed_at=timezone.now(),
+            )
+            if updated:
+                claimed.append(pk)
+    return list(Image.objects.filter(pk__in=claimed))
+
+
+def process_pending(executor, limit=50, lease=None):
+    """
+    处理一批待生成缩略图的图片，返回处理的数量。
+    """
+    images = claim_pending(limit, lease)
+    jobs = []
+    for image in images:
+        storage = image.image.storage
+        names = variant_names(image)
+        targets = {storage.path(name): VARIANTS[field_name] for field_name, name in names.items()}
+        future = executor.submit(render_variants, storage.path(image.image.name), targets)
+        jobs.append((image, names, future))
+
+    for image, names, future in jobs:
+        # 租期过后被其他 worker 重新领取的图片，以后领取的为准
+        claim = Image.objects.filter(pk=image.pk, claimed_at=image.claimed_at)
+        try:
+            future.result()
+        except Exception:
+            claim.update(variant_status=Image.FAILED)
+            continue
+        claim.update(variant_status=Image.DONE, **names)
+    return len(jobs)
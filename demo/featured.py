@@ -0,0 +1,61 @@
+import threading
+import time
+
+from django.conf import settings
+
+from djangoKnowledgeBase.routers import force_primary
+
+
+# MARK: - 首页展示的 Person 缓存
+class FeaturedPersonCache:
+    """
+    缓存首页展示用的 Person 对象。
+
+    同一个请求内只取一次（挂在 request 上），进程内再按 TTL 缓存；
+    Person 被保存或删除时由信号清空缓存。
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires = 0.0
+
+    def _load(self):
+        from .models import Person
+        # 失效由主库上的写入触发，重新填充时若读从库，可能把旧数据再缓存一个 TTL
+        with force_primary():
+            return Person.objects.order_by('pk').first()
+
+    def get(self, request=None):
+        if request is not None and hasattr(request, '_featured_person'):
+            return request._featured_person
+
+        with self._lock:
+            if time.monotonic() < self._expires:
+                self.hits += 1
+                state = 'hit'
+                person = self._value
+            else:
+                self.misses += 1
+                state = 'miss'
+                person = self._value = self._load()
+                self._expires = time.monotonic() + self.ttl
+
+        if request is not None:
+            request._featured_person = person
+            request._featured_person_cache = state
+        return person
+
+    def invalidate(self, **kwargs):
+        with self._lock:
+            self._value = None
+            self._expires = 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+featured_person = FeaturedPersonCache(getattr(settings, 'FEATURED_PERSON_CACHE_TTL', 300))
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.apps import apps
+from django.conf import settings
+from django.dispatch import receiver
+
+from djangoKnowledgeBase.versions import bump_version
+
+from .caching import VERSIONED_MODELS
+from .featured import featured_person
+from .models import Group, Owner, Person, Post
+
+VERSIONED = tuple(apps.get_model(label) for label in VERSIONED_MODELS)
+
+
+@receiver([post_save, post_delete], sender=Person, dispatch_uid="featured_person_invalidate")
+def invalidate_featured_person(sender, **kwargs):
+    featured_person.invalidate()
+
+
+# 页面与模板片段缓存的版本号
+@receiver([post_save, post_delete], dispatch_uid="demo_table_version")
+def bump_table_version(sender, **kwargs):
+    if sender in VERSIONED:
+        bump_version(sender)
+
+
+# 用户或群组改名时同步冗余的作者名
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid="owner_display_name_person")
+@receiver(post_save, sender=Group, dispatch_uid="owner_display_name_group")
+def sync_owner_display_name(sender, instance, created, update_fields=None, **kwargs):
+    # 登录时只保存 last_login 等字段，不必检查
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    field = 'person' if sender is not Group else 'group'
+    name = instance.username
+    # 只更新名字确实变化的行
+    owners = Owner.objects.filter(**{field: instance}).exclude(display_name=name).update(display_name=name)
+    if owners:
+        Post.objects.filter(**{'owner__' + field: instance}).update(owner_display_name=name)
+        # update() 不发送信号，手动使页面缓存失效
+        bump_version(Owner)
+        bump_version(Post)
@@ -0,0 +1,26 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from demo.predicates import PrecomputedPredicates, backfill
+
+
+class Command(BaseCommand):
+    help = '分批重新计算模型的预计算谓词字段'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='+', help='app_label.Model')
+        parser.add_argument('--batch', type=int, default=1000, help='每批处理的行数')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='数据库别名')
+
+    def handle(self, *args, **options):
+        for label in options['models']:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+            if not issubclass(model, PrecomputedPredicates):
+                raise CommandError('{} 没有预计算谓词字段'.format(label))
+
+            updated = backfill(model, options['batch'], options['database'])
+            self.stdout.write('{}: 更新了 {} 行'.format(label, updated))
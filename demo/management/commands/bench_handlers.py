@@ -0,0 +1,61 @@
+import asyncio
+from time import perf_counter_ns
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from djangoKnowledgeBase.benchmark import scratch_databases, throughput, write_table
+
+
+class Command(BaseCommand):
+    help = '对比同一批视图在 WSGI 与 ASGI 处理器下的吞吐量（进程内请求，不含网络开销）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=2.0, help='每项测试的秒数')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8], help='并发请求数')
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def run(self, options):
+        from demo.models import Group, Owner, Post
+
+        owner = Owner.objects.create(group=Group.objects.create(username='bench'))
+        posts = [Post.objects.create(owner=owner, title='bench {}'.format(i), body='body ' * 100) for i in range(50)]
+        post_id = posts[0].id
+
+        urls = [
+            ('sync detail', reverse('demo:detail', args=(post_id,))),
+            ('async detail', reverse('demo:async_detail', args=(post_id,))),
+            ('async home', reverse('demo:async_home')),
+            ('async JSON list', reverse('demo:async_post_list_api')),
+        ]
+
+        rows = []
+        for name, url in urls:
+            for concurrency in options['concurrency']:
+                # WSGI：每个线程一个 Client，与多线程 WSGI 服务器相同
+                clients = [Client() for _ in range(concurrency)]
+                wsgi = throughput(lambda i: clients[i].get(url), concurrency, options['duration'])
+                asgi = asyncio.run(self.asgi_throughput(url, concurrency, options['duration']))
+                rows.append((name, concurrency, '{:,.0f}'.format(wsgi), '{:,.0f}'.format(asgi)))
+
+        write_table(self.stdout, ('view', 'concurrency', 'WSGI req/s', 'ASGI req/s'), rows)
+
+    async def asgi_throughput(self, url, concurrency, duration):
+        # ASGI：一个事件循环中同时发起 concurrency 个请求
+        client = AsyncClient()
+        count = 0
+        start = perf_counter_ns()
+        deadline = start + int(duration * 1e9)
+
+        async def worker():
+            nonlocal count
+            while perf_counter_ns() < deadline:
+                await client.get(url)
+                count += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return count / ((perf_counter_ns() - start) / 1e9)
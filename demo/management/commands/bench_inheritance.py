@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test.utils import isolate_apps
+
+from djangoKnowledgeBase.benchmark import scratch_databases, timed, write_table
+
+
+class Command(BaseCommand):
+    help = (
+        '对比 Human/Baby 多表继承与等价的单表布局（kind 列 + 可为空的 age）：'
+        '读取全部并得到子类实例、只读取 Baby、逐行插入 Baby 的耗时'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--humans', type=int, nargs='+', default=[2000, 20000], help='行数，其中三分之一是 Baby')
+        parser.add_argument('--inserts', type=int, default=500, help='插入测试每轮插入的 Baby 数')
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def run(self, options):
+        from demo.models import Baby, Human
+
+        # 单表布局只在基准测试中建表，不进入 demo 的模型与迁移
+        with isolate_apps('demo'):
+            class FlatHuman(models.Model):
+                name = models.CharField(max_length=100)
+                is_baby = models.BooleanField(default=False)
+                age = models.IntegerField(null=True)
+
+                class Meta:
+                    app_label = 'demo'
+                    db_table = 'bench_flat_human'
+
+        with connection.schema_editor() as editor:
+            editor.create_model(FlatHuman)
+
+        def insert_mti():
+            with transaction.atomic():
+                for i in range(options['inserts']):
+                    Baby.objects.create(name='insert', age=i)
+
+        def insert_flat():
+            with transaction.atomic():
+                for i in range(options['inserts']):
+                    FlatHuman.objects.create(name='insert', is_baby=True, age=i)
+
+        rows = []
+        for count in options['humans']:
+            Human.objects.all().delete()
+            FlatHuman.objects.all().delete()
+            with transaction.atomic():
+                for i in range(count):
+                    if i % 3:
+                        Human.objects.create(name='h{}'.format(i))
+                    else:
+                        Baby.objects.create(name='h{}'.format(i), age=i)
+                FlatHuman.objects.bulk_create(
+                    FlatHuman(name='h{}'.format(i), is_baby=not i % 3, age=None if i % 3 else i)
+                    for i in range(count)
+                )
+
+            cases = (
+                ('all, typed', 'resolve_subclasses()', lambda: list(Human.objects.resolve_subclasses()),
+                 lambda: list(FlatHuman.objects.all())),
+                ('all, typed', "select_related('baby')", lambda: list(Human.objects.select_related('baby')),
+                 lambda: list(FlatHuman.objects.all())),
+                ('babies only', 'Baby.objects', lambda: list(Baby.objects.all()),
+                 lambda: list(FlatHuman.objects.filter(is_baby=True))),
+            )
+            for name, mti_query, mti, flat in cases:
+                rows.append((count, name, mti_query, '{:.1f}'.format(timed(mti)), '{:.1f}'.format(timed(flat))))
+            rows.append((
+                count, '{} inserts'.format(options['inserts']), 'Baby.objects.create',
+                '{:.1f}'.format(timed(insert_mti, repeat=3)), '{:.1f}'.format(timed(insert_flat, repeat=3)),
+            ))
+
+        write_table(self.stdout, ('humans', 'case', 'multi-table', 'multi-table ms', 'single table ms'), rows)
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.utils import timezone
+
+from djangoKnowledgeBase.benchmark import scratch_databases, timed, write_table
+
+
+class Command(BaseCommand):
+    help = '对比 OFFSET 分页与游标分页在第 1 页和深分页时的耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='文章数量')
+        parser.add_argument('--per-page', type=int, default=10)
+        parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 10000])
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def run(self, options):
+        from demo.models import Group, Owner, Post
+        from demo.pagination import CursorPaginator
+        from demo.search import uninstall
+
+        from django.db import connection
+
+        # 全文索引的触发器与分页无关，只会拖慢造数据
+        uninstall(connection)
+        owner = Owner.objects.create(group=Group.objects.create(username='bench'))
+        now = timezone.now()
+        batch = 10000
+        for start in range(0, options['rows'], batch):
+            Post.objects.bulk_create([
+                # 每两篇文章的 created 相同，覆盖游标中的并列情况
+                Post(owner=owner, title='post {}'.format(i), created=now - timedelta(seconds=i // 2))
+                for i in range(start, min(start + batch, options['rows']))
+            ])
+        self.stdout.write('已生成 {:,} 篇文章'.format(options['rows']))
+
+        per_page = options['per_page']
+        queryset = Post.objects.for_listing()
+        offset_paginator = Paginator(queryset, per_page)
+        cursor_paginator = CursorPaginator(queryset, per_page)
+
+        rows = []
+        for number in options['pages']:
+            # 上一页的最后一篇文章即游标位置
+            if number == 1:
+                cursor = None
+            else:
+                last = queryset.order_by('-created', '-id')[(number - 1) * per_page - 1]
+                cursor = cursor_paginator.encode_cursor(last)
+
+            offset_ms = timed(lambda: list(offset_paginator.page(number).object_list), number=20)
+            cursor_ms = timed(lambda: list(cursor_paginator.get_page(cursor)), number=20)
+            rows.append((number, '{:.3f}'.format(offset_ms), '{:.3f}'.format(cursor_ms)))
+
+        write_table(self.stdout, ('page', 'OFFSET ms', 'cursor ms'), rows)
@@ -0,0 +1,70 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+
+from djangoKnowledgeBase.benchmark import scratch_databases, throughput, write_table
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'demo.session_backend',
+)
+
+
+class Command(BaseCommand):
+    help = '对比 db、cached_db 与延迟写入的 Session 后端：每次请求载入、修改并保存一次 Session'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=2.0, help='每项测试的秒数')
+        parser.add_argument('--threads', type=int, nargs='+', default=[1, 4], help='线程数')
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def run(self, options):
+        from django.core.cache import cache
+        from demo.session_backend import buffer
+
+        def counter(session):
+            # 计数器：每次请求加一（visits_count 视图的写法）
+            session['visits_count'] = session.get('visits_count', 0) + 1
+
+        def unchanged(session):
+            session.get('visits_count')
+
+        def other_key(session):
+            # 非计数器的 key 变化（如登录信息），延迟写入的后端也立即写库
+            session['last_page'] = session.get('last_page', 0) + 1
+
+        cases = (('counter', counter), ('unchanged', unchanged), ('other key', other_key))
+        rows = []
+        for engine in ENGINES:
+            store_class = import_module(engine).SessionStore
+            for name, change in cases:
+                cache.clear()
+                keys = []
+                for _ in range(max(options['threads'])):
+                    session = store_class()
+                    session['visits_count'] = 0
+                    session.create()
+                    keys.append(session.session_key)
+
+                def request(index):
+                    # 与 SessionMiddleware 相同：只在 Session 被修改时保存
+                    session = store_class(keys[index])
+                    change(session)
+                    if session.modified:
+                        session.save()
+
+                row = [engine.rsplit('.', 1)[-1], name]
+                for threads in options['threads']:
+                    row.append('{:,.0f}'.format(throughput(request, threads, options['duration'])))
+                rows.append(row)
+                buffer.flush()
+
+        write_table(
+            self.stdout,
+            ('engine', 'change', *('{} thread(s) req/s'.format(threads) for threads in options['threads'])),
+            rows,
+        )
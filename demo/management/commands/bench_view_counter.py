@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from djangoKnowledgeBase.benchmark import scratch_databases, throughput, write_table
+
+
+class Command(BaseCommand):
+    help = '对比阅读量的两种写法：每次访问一条 UPDATE 与进程内缓冲计数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100, help='文章数量')
+        parser.add_argument('--duration', type=float, default=2.0, help='每项测试的秒数')
+        parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8], help='线程数')
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def run(self, options):
+        from demo.counters import ViewCounter
+        from demo.models import Group, Owner, Post
+
+        owner = Owner.objects.create(group=Group.objects.create(username='bench'))
+        Post.objects.bulk_create([Post(owner=owner, title='bench {}'.format(i)) for i in range(options['posts'])])
+        pks = list(Post.objects.values_list('pk', flat=True))
+
+        def direct_update(index):
+            # 改动前 increase_view() 的写法
+            pk = pks[(index * 7919 + direct_update.calls) % len(pks)]
+            direct_update.calls += 1
+            Post.objects.filter(pk=pk).update(views=F('views') + 1)
+        direct_update.calls = 0
+
+        counter = ViewCounter('demo.Post', 'views', flush_interval=None)
+
+        def buffered(index):
+            pk = pks[(index * 7919 + buffered.calls) % len(pks)]
+            buffered.calls += 1
+            counter.incr(pk)
+        buffered.calls = 0
+
+        rows = []
+        for threads in options['threads']:
+            before = throughput(direct_update, threads, options['duration'])
+            after = throughput(buffered, threads, options['duration'])
+            counter.flush()
+            rows.append((threads, '{:,.0f}'.format(before), '{:,.0f}'.format(after), '{:.0f}x'.format(after / before)))
+
+        write_table(self.stdout, ('threads', 'UPDATE/s', 'buffered/s', 'speedup'), rows)
+        total = sum(Post.objects.values_list('views', flat=True))
+        self.stdout.write('写入数据库的阅读量合计：{}'.format(total))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from demo.template_bundle import bundle_path, compile_templates, write_bundle
+
+
+class Command(BaseCommand):
+    help = '编译全部模板并生成预热清单，同时报告每个模板的解析耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='只检查语法与解析耗时，不生成清单')
+        parser.add_argument('--top', type=int, default=20, help='列出解析最慢的模板数量')
+
+    def handle(self, *args, **options):
+        results = compile_templates()
+        errors = {name: result for name, result in results.items() if result['error']}
+
+        slowest = sorted(results.items(), key=lambda item: item[1]['parse_ms'], reverse=True)
+        self.stdout.write('{:>10}  模板'.format('解析(ms)'))
+        for name, result in slowest[:options['top']]:
+            self.stdout.write('{:>10.3f}  {}'.format(result['parse_ms'], name))
+        total = sum(result['parse_ms'] for result in results.values())
+        self.stdout.write('共 {} 个模板，解析总耗时 {:.1f} ms'.format(len(results), total))
+
+        for name, result in errors.items():
+            self.stderr.write('{}: {}'.format(result['path'], result['error']))
+        if errors:
+            raise CommandError('{} 个模板存在语法错误'.format(len(errors)))
+
+        if not options['check']:
+            names = write_bundle(results)
+            self.stdout.write('已写入 {}（{} 个模板）'.format(bundle_path(), len(names)))
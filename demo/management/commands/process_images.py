@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from demo.derivatives import process_pending
+
+
+class Command(BaseCommand):
+    help = '为上传的图片生成缩略图（以数据库为任务队列，进程池处理）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='进程数，默认为 CPU 核数')
+        parser.add_argument('--batch', type=int, default=50, help='每次领取的图片数量')
+        parser.add_argument('--interval', type=float, default=2.0, help='队列为空时的轮询间隔（秒）')
+        parser.add_argument(
+            '--lease', type=float, default=getattr(settings, 'IMAGE_CLAIM_LEASE', 600),
+            help='任务租期（秒），应大于处理一批图片所需的时间',
+        )
+        parser.add_argument('--once', action='store_true', help='处理完当前队列后退出')
+
+    def handle(self, *args, **options):
+        # 异常退出的 worker 遗留的任务在租期过后由 claim_pending 重新领取，
+        # 不在启动时重置，以免抢走其他仍在运行的 worker 正在处理的图片
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                count = process_pending(executor, options['batch'], options['lease'])
+                if count:
+                    self.stdout.write('已处理 {} 张图片'.format(count))
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['interval'])
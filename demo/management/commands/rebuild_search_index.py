@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from demo import search
+
+
+class Command(BaseCommand):
+    help = '重建全文索引（同时补建被表结构迁移删除的同步触发器）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='数据库别名')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.install(connection):
+            raise CommandError('全文索引需要 SQLite {}.{}.{} 及以上版本'.format(*search.MIN_SQLITE_VERSION))
+        for table in search.FTS_TABLES:
+            self.stdout.write('已重建 {}'.format(search.fts_table(table)))
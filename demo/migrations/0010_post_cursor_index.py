@@ -0,0 +1,29 @@
+# Generated by Django 3.0.5 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0009_book'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-created', '-id')},
+        ),
+        migrations.AlterModelOptions(
+            name='postqs',
+            options={'ordering': ('-created', '-id')},
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created', '-id'], name='post_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postqs',
+            index=models.Index(fields=['-created', '-id'], name='postqs_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0010_post_cursor_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='myuser',
+            name='first_name',
+            field=models.CharField(blank=True, max_length=150, verbose_name='first name'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0011_alter_myuser_first_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0012_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='medium',
+            field=models.ImageField(blank=True, editable=False, upload_to='images/medium/%Y%m%d'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='images/thumbs/%Y%m%d'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='variant_status',
+            field=models.CharField(choices=[('pending', '待处理'), ('processing', '处理中'), ('done', '已完成'), ('failed', '失败')], db_index=True, default='pending', editable=False, max_length=20),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0013_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated'], name='post_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+import sqlite3
+
+from django.db import migrations
+
+# 迁移中保存建表语句的副本，不随 demo.search 的后续修改而变化
+# trigram 分词器需要 SQLite 3.34+
+POST_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS demo_post_fts_ai AFTER INSERT ON demo_post BEGIN "
+    "INSERT INTO demo_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_post_fts_ad AFTER DELETE ON demo_post BEGIN "
+    "INSERT INTO demo_post_fts(demo_post_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_post_fts_au AFTER UPDATE OF title, body ON demo_post BEGIN "
+    "INSERT INTO demo_post_fts(demo_post_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO demo_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+BOOK_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS demo_book_fts_ai AFTER INSERT ON demo_book BEGIN "
+    "INSERT INTO demo_book_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_book_fts_ad AFTER DELETE ON demo_book BEGIN "
+    "INSERT INTO demo_book_fts(demo_book_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_book_fts_au AFTER UPDATE OF title ON demo_book BEGIN "
+    "INSERT INTO demo_book_fts(demo_book_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO demo_book_fts(rowid, title) VALUES (new.id, new.title); END",
+]
+
+
+def fts_supported(schema_editor):
+    return schema_editor.connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def install(apps, schema_editor):
+    if not fts_supported(schema_editor):
+        return
+    for table, columns, triggers in (
+        ('demo_post', 'title, body', POST_TRIGGERS),
+        ('demo_book', 'title', BOOK_TRIGGERS),
+    ):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5({columns}, content='{table}', "
+            "content_rowid='id', tokenize='trigram')".format(table=table, columns=columns)
+        )
+        for sql in triggers:
+            schema_editor.execute(sql)
+        schema_editor.execute("INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')".format(table=table))
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in ('demo_post', 'demo_book'):
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute('DROP TRIGGER IF EXISTS {}_fts_{}'.format(table, suffix))
+        schema_editor.execute('DROP TABLE IF EXISTS {}_fts'.format(table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0014_post_updated_index'),
+    ]
+
+    operations = [
+        # 文章标题、正文与书名的 FTS5 全文索引（仅 SQLite）
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+def backfill_has_again(apps, schema_editor):
+    # 历史模型没有 save() 中的计算逻辑，直接按 LIKE 更新一次
+    Book = apps.get_model('demo', 'Book')
+    Book.objects.filter(title__contains='again').update(has_again=True)
+
+
+# 迁移中保存触发器语句的副本，与 0015 相同
+BOOK_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS demo_book_fts_ai AFTER INSERT ON demo_book BEGIN "
+    "INSERT INTO demo_book_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_book_fts_ad AFTER DELETE ON demo_book BEGIN "
+    "INSERT INTO demo_book_fts(demo_book_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_book_fts_au AFTER UPDATE OF title ON demo_book BEGIN "
+    "INSERT INTO demo_book_fts(demo_book_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO demo_book_fts(rowid, title) VALUES (new.id, new.title); END",
+]
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite 上 AddField 会重建 demo_book 表，全文索引的同步触发器随之丢失
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if 'demo_book_fts' not in schema_editor.connection.introspection.table_names():
+        return
+    for sql in BOOK_TRIGGERS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0015_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='has_again',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(has_again=True), fields=['id'], name='book_has_again_idx'),
+        ),
+        migrations.RunPython(backfill_has_again, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
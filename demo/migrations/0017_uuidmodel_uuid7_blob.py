@@ -0,0 +1,40 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:48
+
+import demo.uuids
+from django.db import migrations
+
+
+# SQLite 重建表时按原样复制了 char(32) 的十六进制文本，这里转换成 16 字节
+def hex_to_blob(apps, schema_editor):
+    connection = schema_editor.connection
+    if not getattr(connection.features, 'has_binary_uuid_field', False):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM demo_uuidmodel WHERE typeof(id) = 'text'")
+        rows = [(bytes.fromhex(value), value) for (value,) in cursor.fetchall()]
+        cursor.executemany('UPDATE demo_uuidmodel SET id = %s WHERE id = %s', rows)
+
+
+def blob_to_hex(apps, schema_editor):
+    connection = schema_editor.connection
+    if not getattr(connection.features, 'has_binary_uuid_field', False):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("UPDATE demo_uuidmodel SET id = lower(hex(id)) WHERE typeof(id) = 'blob'")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0016_book_has_again'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uuidmodel',
+            name='id',
+            field=demo.uuids.BinaryUUIDField(default=demo.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        # 已有的 uuid1 主键保持原值，只改变存储格式；新行使用 uuid7
+        migrations.RunPython(hex_to_blob, blob_to_hex),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.1.14 on 2026-10-18 16:50
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_display_name(apps, schema_editor):
+    # 历史模型没有 save() 中的计算逻辑，用子查询各更新一次
+    MyUser = apps.get_model('demo', 'MyUser')
+    Group = apps.get_model('demo', 'Group')
+    Owner = apps.get_model('demo', 'Owner')
+    Post = apps.get_model('demo', 'Post')
+    Owner.objects.update(display_name=Coalesce(
+        Subquery(MyUser.objects.filter(pk=OuterRef('person_id')).values('username')[:1]),
+        Subquery(Group.objects.filter(pk=OuterRef('group_id')).values('username')[:1]),
+        models.Value(''),
+    ))
+    Post.objects.update(
+        owner_display_name=Subquery(Owner.objects.filter(pk=OuterRef('owner_id')).values('display_name')[:1])
+    )
+
+
+# 迁移中保存触发器语句的副本，与 0015 相同
+POST_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS demo_post_fts_ai AFTER INSERT ON demo_post BEGIN "
+    "INSERT INTO demo_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_post_fts_ad AFTER DELETE ON demo_post BEGIN "
+    "INSERT INTO demo_post_fts(demo_post_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS demo_post_fts_au AFTER UPDATE OF title, body ON demo_post BEGIN "
+    "INSERT INTO demo_post_fts(demo_post_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO demo_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite 上 AddField 会重建 demo_post 表，全文索引的同步触发器随之丢失
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if 'demo_post_fts' not in schema_editor.connection.introspection.table_names():
+        return
+    for sql in POST_TRIGGERS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0017_uuidmodel_uuid7_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='owner',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='owner_display_name',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.RunPython(backfill_display_name, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('demo', '0018_owner_display_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
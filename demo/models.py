@@ -1,12 +1,17 @@
 from django.db import models
 from django.utils import timezone
 from django.urls import reverse
-from django.db.models import F
+from django.utils.html import format_html
+from django.db.models import prefetch_related_objects
 from django.contrib.auth.models import User
 
 from djangoKnowledgeBase.settings import AUTH_USER_MODEL
+from djangoKnowledgeBase.versions import bump_version
 
-import uuid
+from .counters import view_counter
+from .polymorphic import PolymorphicQuerySet
+from .predicates import PrecomputedPredicates, PredicateManager
+from .uuids import BinaryUUIDField, uuid7
 
 # from django.db.models.signals import post_save
 # from django.dispatch import receiver
@@ -60,23 +65,85 @@ class Owner(models.Model):
         related_name='owner'
     )
 
+    # person / group 的 username 冗余一份，列表页与 __str__ 不必再查询关联表
+    display_name = models.CharField(max_length=150, blank=True, editable=False)
+
     def get_owner(self):
         # 获取非空 Owner 对象
-        if self.person is not None:
+        # 先判断外键 id，避免为空的一侧也触发查询
+        if self.person_id is not None:
             return self.person
-        elif self.group is not None:
+        elif self.group_id is not None:
             return self.group
         raise AssertionError("Neither is set")
 
+    def resolve_display_name(self):
+        if self.person_id is None and self.group_id is None:
+            return ''
+        return self.get_owner().username
+
+    def save(self, *args, **kwargs):
+        previous = self.display_name
+        self.display_name = self.resolve_display_name()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'display_name'}
+        super().save(*args, **kwargs)
+        # 更换了 person / group 时同步已有文章上的冗余作者名
+        if previous != self.display_name:
+            self.sync_posts()
+
+    def sync_posts(self):
+        updated = self.posts.exclude(owner_display_name=self.display_name).update(
+            owner_display_name=self.display_name,
+        )
+        if updated:
+            # update() 不发送信号，手动使页面缓存失效
+            bump_version(Post)
+        return updated
+
     def __str__(self):
-        if self.person is not None:
+        if self.display_name:
+            return self.display_name
+        if self.person_id is not None:
             return self.person.username
-        elif self.group is not None:
+        elif self.group_id is not None:
             return self.group.username
         else:
             return 'No owner here..'
 
 
+def resolve_owners(objs):
+    """
+    批量取回 Owner（或 Post 的 owner）关联的用户与群组：
+    Owner 列表共 2 次查询，Post 列表再加 1 次查询 Owner，与行数无关。
+    之后 get_owner() / __str__ 都不再访问数据库。
+    """
+    objs = list(objs)
+    if objs and isinstance(objs[0], Post):
+        prefetch_related_objects(objs, 'owner__person', 'owner__group')
+    else:
+        prefetch_related_objects(objs, 'person', 'group')
+    return objs
+
+
+# MARK: - QuerySet 预加载
+class PostQuerySet(models.QuerySet):
+    def with_owner(self):
+        # 一次 JOIN 取回 owner 及其 person / group，
+        # 并且只读取详情页模板用到的列
+        return self.select_related('owner__person', 'owner__group').only(
+            'title', 'body', 'views', 'updated',
+            'owner__person__username',
+            'owner__group__username',
+        )
+
+    def for_listing(self):
+        # 首页列表只用到 id 和 title
+        # 作者名使用冗余列 owner_display_name，无需 JOIN
+        return self.only('id', 'title', 'created', 'owner_display_name')
+
+
 class Post(models.Model):
     # MARK: - ForeignKey 对多个对象
     owner = models.ForeignKey(Owner, on_delete=models.CASCADE, related_name='posts')
@@ -89,17 +156,45 @@ class Post(models.Model):
     created = models.DateTimeField(default=timezone.now)
     updated = models.DateTimeField(auto_now=True)
 
+    # 与 Owner.display_name 相同，用户或群组改名时由信号同步
+    owner_display_name = models.CharField(max_length=150, blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
-        ordering = ('-created',)
+        ordering = ('-created', '-id')
+        # 游标分页按 (created, id) 倒序读取
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='post_created_id_idx'),
+            # 首页 ETag 取 max(updated)
+            models.Index(fields=['updated'], name='post_updated_idx'),
+        ]
 
     def get_absolute_url(self):
         return reverse('demo:detail', args=(self.id,))
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # 只更新阅读量等其他字段时不读取 owner
+        if update_fields is None or 'owner' in update_fields:
+            self.owner_display_name = self.owner.display_name
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'owner_display_name'}
+        super().save(*args, **kwargs)
+
     def increase_view(self):
         # MARK: - F()
         # self.views += 1
-        self.views = F('views') + 1
-        self.save(update_fields=['views'])
+        # self.views = F('views') + 1
+        # self.save(update_fields=['views'])
+
+        # 计数先累加在内存中，由 view_counter 批量写回数据库
+        view_counter.incr(self.pk)
+
+    @property
+    def total_views(self):
+        # 已写入数据库的阅读量 + 尚未刷新的阅读量
+        return self.views + view_counter.pending(self.pk)
 
     def __str__(self):
         return self.title
@@ -107,11 +202,13 @@ class Post(models.Model):
 
 # MARK: - UUID
 class UUIDModel(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid1, editable=False)
+    # id = models.UUIDField(primary_key=True, default=uuid.uuid1, editable=False)
+    # 按时间递增的 UUIDv7，SQLite 上以 16 字节 BLOB 保存
+    id = BinaryUUIDField(primary_key=True, default=uuid7, editable=False)
     content = models.TextField(default='uuid demo content')
 
     def __str__(self):
-        return self.id
+        return str(self.id)
 
 
 # MARK: - @property
@@ -147,6 +244,9 @@ class Bird(Animal):
 class Human(models.Model):
     name = models.CharField(max_length=100)
 
+    # Human.objects.resolve_subclasses() 批量取回 Baby 等子类实例
+    objects = PolymorphicQuerySet.as_manager()
+
 
 class Baby(Human):
     age = models.IntegerField(default=0)
@@ -180,12 +280,38 @@ class Age(models.Model):
 
 # MARK: - 批量上传文件
 class Image(models.Model):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    VARIANT_STATUS_CHOICES = (
+        (PENDING, '待处理'),
+        (PROCESSING, '处理中'),
+        (DONE, '已完成'),
+        (FAILED, '失败'),
+    )
+
     image = models.ImageField(upload_to='images/%Y%m%d')
+    # 文件内容的 sha256，用于去重
+    content_hash = models.CharField(max_length=64, unique=True, null=True, editable=False)
+
+    # 缩略图由 process_images 命令在后台生成
+    thumbnail = models.ImageField(upload_to='images/thumbs/%Y%m%d', blank=True, editable=False)
+    medium = models.ImageField(upload_to='images/medium/%Y%m%d', blank=True, editable=False)
+    variant_status = models.CharField(
+        max_length=20,
+        choices=VARIANT_STATUS_CHOICES,
+        default=PENDING,
+        db_index=True,
+        editable=False,
+    )
+    # worker 领取任务的时间，租期过后其他 worker 可以重新领取
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     def admin_image(self):
-        return '<img src="%s"/>' % self.image
-
-    admin_image.allow_tags = True
+        # return '<img src="%s"/>' % self.image
+        url = self.thumbnail.url if self.thumbnail else self.image.url
+        return format_html('<img src="{}" width="160"/>', url)
 
 
 # MARK: - Queryset
@@ -198,30 +324,51 @@ class PostQS(models.Model):
     created = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ('-created',)
+        ordering = ('-created', '-id')
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='postqs_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
 # MARK: - create() by CustomManager
-class BookManager(models.Manager):
+class BookManager(PredicateManager):
+    def __init__(self):
+        # title 中含有 'again' 的书，由 Book.save() 预先计算
+        super().__init__('has_again')
+
     def create_book(self, title):
         book = self.create(title=title)
         book.save()
         # do something with the book
         return book
 
-    def get_queryset(self):
-        return super().get_queryset().filter(title__contains='again')
+    # def get_queryset(self):
+    #     return super().get_queryset().filter(title__contains='again')
+
+
+def title_has_again(book):
+    # 与 SQLite 的 LIKE '%again%' 一致，不区分大小写
+    return 'again' in book.title.lower()
 
 
-class Book(models.Model):
+class Book(PrecomputedPredicates):
     title = models.CharField(max_length=100)
+    has_again = models.BooleanField(default=False, editable=False)
 
     objects = models.Manager()
     custom = BookManager()
 
+    predicates = {'has_again': title_has_again}
+
+    class Meta:
+        indexes = [
+            # 部分索引，只包含 has_again 为真的行
+            models.Index(fields=['id'], condition=models.Q(has_again=True), name='book_has_again_idx'),
+        ]
+
     @classmethod
     def create(cls, title):
         book = cls(title=title)
@@ -0,0 +1,76 @@
+import base64
+import json
+
+from django.utils.dateparse import parse_datetime
+
+
+# MARK: - 游标分页
+class CursorPage:
+    def __init__(self, object_list, next_cursor, cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        # 游标只能向后翻页，非首页时提供回到首页的入口
+        return self.cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    """
+    基于 (created, id) 的游标分页。
+
+    与 OFFSET 分页不同，翻到第几页都只需从索引的某个位置开始读取 per_page 条，
+    查询耗时不随页码增长。queryset 需按 ('-created', '-id') 排序。
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by('-created', '-id')
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(obj):
+        raw = json.dumps([obj.created.isoformat(), obj.pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            created = parse_datetime(created)
+        except (TypeError, ValueError):
+            return None
+        if created is None or not isinstance(pk, int):
+            return None
+        return created, pk
+
+    def get_page(self, cursor=None):
+        # 游标无效时返回第一页，与 Paginator.get_page() 的行为一致
+        position = self.decode_cursor(cursor) if cursor else None
+        queryset = self.queryset
+        if position is None:
+            cursor = None
+        else:
+            created, pk = position
+            # 等价于 (created, id) < (cursor.created, cursor.id)
+            queryset = queryset.filter(created__lte=created).exclude(created=created, pk__gte=pk)
+
+        # 多取一条，用于判断是否还有下一页
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return CursorPage(object_list, next_cursor, cursor)
@@ -0,0 +1,97 @@
+from itertools import islice
+
+from django.db import models
+from django.db.models.query import ModelIterable
+
+
+# MARK: - 多表继承的子类解析
+def child_models(model):
+    """model 的直接子类（多表继承，不含抽象类与代理模型）"""
+    return [
+        sub for sub in model.__subclasses__()
+        if not sub._meta.abstract and not sub._meta.proxy and model in sub._meta.parents
+    ]
+
+
+def resolve_subclasses(objs, using=None):
+    """
+    把父类实例替换成对应的子类实例，保持原有顺序。
+
+    每个子类只查询一次（pk__in），而不是逐行访问 human.baby 造成 N+1；
+    更深层的子类只在上一层命中的主键中继续查找。
+    父类实例上 select_related / prefetch_related 的结果转移到子类实例上。
+    """
+    if not objs:
+        return objs
+
+    resolved = {obj.pk: obj for obj in objs}
+
+    def descend(model, pks):
+        for child in child_models(model):
+            found = {obj.pk: obj for obj in child._base_manager.using(using).filter(pk__in=pks)}
+            if found:
+                resolved.update(found)
+                descend(child, list(found))
+
+    descend(type(objs[0]), list(resolved))
+
+    results = []
+    for parent in objs:
+        obj = resolved[parent.pk]
+        if obj is not parent:
+            for name, value in parent._state.fields_cache.items():
+                obj._state.fields_cache.setdefault(name, value)
+            if hasattr(parent, '_prefetched_objects_cache'):
+                obj._prefetched_objects_cache = parent._prefetched_objects_cache
+        results.append(obj)
+    return results
+
+
+class PolymorphicQuerySet(models.QuerySet):
+    """
+    Human.objects.resolve_subclasses() 返回的结果中，Baby 行直接是 Baby 实例。
+
+    查询次数为 1 + 子类数量，与结果行数无关；iterator() 每个分块另查一次各子类。
+    只有一层子类、且不需要分页时，select_related('baby') 用一次 LEFT JOIN 也能避免 N+1。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resolve_subclasses = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._resolve_subclasses = self._resolve_subclasses
+        return clone
+
+    def resolve_subclasses(self):
+        clone = self._chain()
+        clone._resolve_subclasses = True
+        return clone
+
+    def _resolve(self, objs):
+        resolved = resolve_subclasses(objs, using=self.db)
+        # 保留父类查询中的 annotate() 结果
+        for parent, obj in zip(objs, resolved):
+            for name in self.query.annotations:
+                setattr(obj, name, getattr(parent, name))
+        return resolved
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if fetched or not self._resolve_subclasses or self._iterable_class is not ModelIterable:
+            return
+        self._result_cache = self._resolve(self._result_cache)
+
+    def _iterator(self, use_chunked_fetch, chunk_size):
+        rows = super()._iterator(use_chunked_fetch, chunk_size)
+        if not self._resolve_subclasses or self._iterable_class is not ModelIterable:
+            yield from rows
+            return
+        # 按 chunk_size 分批解析子类，不把全部结果留在内存中
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield from self._resolve(chunk)
@@ -0,0 +1,71 @@
+from django.db import models, transaction
+
+
+# MARK: - 预计算谓词
+class PredicateManager(models.Manager):
+    """
+    只返回某个预计算布尔字段为 True 的行。
+
+    配合部分索引（Index(condition=Q(field=True))）使用，
+    查询只读取索引中满足条件的少量行，而不是对整表做 LIKE 扫描。
+    """
+
+    def __init__(self, field):
+        super().__init__()
+        self.field = field
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{self.field: True})
+
+
+class PrecomputedPredicates(models.Model):
+    """
+    在 save() 时计算并保存谓词字段的模型基类。
+
+    子类定义 predicates = {字段名: 函数(实例) -> bool}，字段本身需另外声明。
+    注意 QuerySet.update() / bulk_create() 不经过 save()，之后需执行
+    python manage.py backfill_predicates <app_label.Model>。
+    """
+    predicates = {}
+
+    class Meta:
+        abstract = True
+
+    def refresh_predicates(self):
+        changed = []
+        for field, predicate in self.predicates.items():
+            value = bool(predicate(self))
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.append(field)
+        return changed
+
+    def save(self, *args, **kwargs):
+        self.refresh_predicates()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # 只更新部分字段时，谓词字段也要一起写入
+            kwargs['update_fields'] = set(update_fields) | set(self.predicates)
+        super().save(*args, **kwargs)
+
+
+def backfill(model, batch_size=1000, using=None):
+    """
+    按主键分批重新计算谓词字段，只写回发生变化的行。返回更新的行数。
+    每批一个事务，不会长时间占用写锁。
+    """
+    queryset = model._base_manager.using(using).order_by('pk')
+    last_pk = None
+    updated = 0
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        objs = list(batch[:batch_size])
+        if not objs:
+            return updated
+        last_pk = objs[-1].pk
+
+        changed = [obj for obj in objs if obj.refresh_predicates()]
+        if changed:
+            with transaction.atomic(using=using):
+                model._base_manager.using(using).bulk_update(changed, list(model.predicates))
+            updated += len(changed)
@@ -0,0 +1,198 @@
+import sqlite3
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.html import escape
+
+# 全文索引：{表名: 需要索引的列}
+# 使用外部内容表（content=），索引中不重复保存正文，由触发器同步
+FTS_TABLES = {
+    'demo_post': ('title', 'body'),
+    'demo_book': ('title',),
+}
+
+# trigram 分词器支持任意子串（含中文）匹配，语义与 LIKE '%...%' 相同，需 SQLite 3.34+
+MIN_SQLITE_VERSION = (3, 34, 0)
+# trigram 分词器要求每个查询词至少 3 个字符
+MIN_TERM_LENGTH = 3
+
+# highlight() / snippet() 中使用的占位符，先转义正文再换成 <mark>
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def fts_table(table):
+    return '{}_fts'.format(table)
+
+
+def fts_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    return sqlite3.sqlite_version_info >= MIN_SQLITE_VERSION
+
+
+# MARK: - 建立索引
+def install_sql(table, columns):
+    fts = fts_table(table)
+    cols = ', '.join(columns)
+    new = ', '.join('new.{}'.format(c) for c in columns)
+    old = ', '.join('old.{}'.format(c) for c in columns)
+    delete = "INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});".format(
+        fts=fts, cols=cols, old=old)
+    insert = "INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});".format(fts=fts, cols=cols, new=new)
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+        "content_rowid='id', tokenize='trigram')".format(fts=fts, cols=cols, table=table),
+        "CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END".format(
+            fts=fts, table=table, insert=insert),
+        "CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END".format(
+            fts=fts, table=table, delete=delete),
+        # 只在索引列变化时触发，阅读量等其他列的批量 UPDATE 不受影响
+        "CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END".format(
+            fts=fts, table=table, cols=cols, delete=delete, insert=insert),
+    ]
+
+
+def uninstall_sql(table):
+    fts = fts_table(table)
+    return [
+        'DROP TRIGGER IF EXISTS {}_ai'.format(fts),
+        'DROP TRIGGER IF EXISTS {}_ad'.format(fts),
+        'DROP TRIGGER IF EXISTS {}_au'.format(fts),
+        'DROP TABLE IF EXISTS {}'.format(fts),
+    ]
+
+
+def install(connection):
+    """
+    创建全文索引表与同步触发器并重建索引，可重复执行。
+
+    SQLite 上修改表结构的迁移会重建原表并丢失触发器，
+    之后需要执行 python manage.py rebuild_search_index。
+    """
+    if not fts_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        for table, columns in FTS_TABLES.items():
+            for sql in install_sql(table, columns):
+                cursor.execute(sql)
+            cursor.execute("INSERT INTO {fts}({fts}) VALUES ('rebuild')".format(fts=fts_table(table)))
+    return True
+
+
+def missing_triggers(connection):
+    """返回缺失的同步触发器名称；SQLite 上修改表结构的迁移重建原表后触发器会丢失"""
+    if not fts_supported(connection):
+        return []
+    tables = connection.introspection.table_names()
+    expected = [
+        '{}_{}'.format(fts_table(table), suffix)
+        for table in FTS_TABLES if fts_table(table) in tables
+        for suffix in ('ai', 'ad', 'au')
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {name for (name,) in cursor.fetchall()}
+    return [name for name in expected if name not in existing]
+
+
+def uninstall(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for table in FTS_TABLES:
+            for sql in uninstall_sql(table):
+                cursor.execute(sql)
+
+
+# 已确认存在的全文索引：{(数据库别名, 表名)}
+_available = set()
+
+
+def index_available(connection, table):
+    key = (connection.alias, table)
+    if key in _available:
+        return True
+    if fts_supported(connection) and fts_table(table) in connection.introspection.table_names():
+        _available.add(key)
+        return True
+    return False
+
+
+# MARK: - 查询
+def match_expression(text):
+    """
+    把用户输入转成 FTS5 查询：每个词作为一个短语（不解析 AND / OR / * 等语法），词之间为 AND。
+    不足 3 个字符的词无法使用 trigram 索引，返回 None。
+    """
+    terms = text.split()
+    if not terms or any(len(term) < MIN_TERM_LENGTH for term in terms):
+        return None
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def render_marks(text):
+    # 先转义 HTML，再把占位符换成 <mark>，避免正文中的 HTML 被执行
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search_posts(text, limit=20):
+    """
+    按 bm25 相关度排序的文章搜索，标题命中的权重是正文的 10 倍。
+    每个结果带有 title_html（高亮）与 snippet_html（正文摘要）。
+    """
+    # models 中引用了本模块，这里延迟导入
+    from .models import Post
+
+    expression = match_expression(text)
+    connection = connections[Post.objects.db]
+    if expression is None or not index_available(connection, 'demo_post'):
+        # 与全文索引一样同时搜索标题与正文
+        text = text.strip()
+        posts = list(
+            Post.objects.filter(Q(title__icontains=text) | Q(body__icontains=text))
+            .only('id', 'title', 'body').order_by('-id')[:limit]
+        )
+        for post in posts:
+            post.title_html = escape(post.title)
+            post.snippet_html = escape(post.body[:64])
+        return posts
+
+    sql = (
+        "SELECT p.id, p.title, "
+        "highlight(demo_post_fts, 0, %s, %s) AS title_marked, "
+        "snippet(demo_post_fts, 1, %s, %s, '…', 64) AS snippet_marked, "
+        "bm25(demo_post_fts, 10.0, 1.0) AS rank "
+        "FROM demo_post_fts JOIN demo_post p ON p.id = demo_post_fts.rowid "
+        "WHERE demo_post_fts MATCH %s ORDER BY rank LIMIT %s"
+    )
+    params = (MARK_START, MARK_END, MARK_START, MARK_END, expression, limit)
+    posts = list(Post.objects.raw(sql, params))
+    for post in posts:
+        post.title_html = render_marks(post.title_marked)
+        post.snippet_html = render_marks(post.snippet_marked)
+    return posts
+
+
+def search_books(text, limit=20):
+    """按 bm25 相关度排序的书名搜索，每个结果带有 title_html（高亮）"""
+    from .models import Book
+
+    expression = match_expression(text)
+    connection = connections[Book.objects.db]
+    if expression is None or not index_available(connection, 'demo_book'):
+        books = list(Book.objects.filter(title__icontains=text.strip()).order_by('-id')[:limit])
+        for book in books:
+            book.title_html = escape(book.title)
+        return books
+
+    sql = (
+        "SELECT b.id, b.title, b.has_again, "
+        "highlight(demo_book_fts, 0, %s, %s) AS title_marked, "
+        "bm25(demo_book_fts) AS rank "
+        "FROM demo_book_fts JOIN demo_book b ON b.id = demo_book_fts.rowid "
+        "WHERE demo_book_fts MATCH %s ORDER BY rank LIMIT %s"
+    )
+    books = list(Book.objects.raw(sql, (MARK_START, MARK_END, expression, limit)))
+    for book in books:
+        book.title_html = render_marks(book.title_marked)
+    return books
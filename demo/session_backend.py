@@ -0,0 +1,201 @@
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import router, transaction
+from django.utils import timezone
+
+
+# MARK: - 延迟写入的 Session 后端
+class SessionWriteBuffer:
+    """
+    待写入数据库的 Session：{session_key: (序列化后的数据, 过期时间)}。
+
+    频繁修改的 Session（例如每次访问都加一的计数器）先保存在内存里，
+    由后台线程定期批量写入数据库。
+    注意：缓冲区是进程内的，多进程部署时各进程看到的数据可能不一致。
+    """
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = {}
+        self._worker = None
+
+    def get(self, session_key):
+        with self._lock:
+            entry = self._dirty.get(session_key)
+        if entry is None or entry[1] <= timezone.now():
+            return None
+        return entry
+
+    def put(self, session_key, payload, expire_date):
+        with self._lock:
+            self._dirty[session_key] = (payload, expire_date)
+        self._ensure_worker()
+
+    def discard(self, session_key):
+        with self._lock:
+            self._dirty.pop(session_key, None)
+
+    def write_through(self, session_key, write):
+        """
+        立即写入数据库并丢弃缓冲区中的旧数据。
+        与 flush() 互斥，避免后台线程随后用缓冲区中的旧数据覆盖刚写入的行。
+        """
+        with self._flush_lock:
+            write()
+            self.discard(session_key)
+
+    def purge_expired(self):
+        now = timezone.now()
+        with self._lock:
+            for session_key in [key for key, (_, expire_date) in self._dirty.items() if expire_date <= now]:
+                del self._dirty[session_key]
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending = dict(self._dirty)
+            if not pending:
+                return 0
+
+            store = SessionStore()
+            model = store.model
+            using = router.db_for_write(model)
+            # 新 Session 已由 save(must_create=True) 写入数据库，
+            # 这里找不到的行说明 Session 已被删除（注销、delete()、clear_expired），不能重新插入
+            deleted = set()
+            with transaction.atomic(using=using):
+                for session_key, (payload, expire_date) in pending.items():
+                    data = store.encode(store.serializer().loads(payload))
+                    updated = model.objects.using(using).filter(session_key=session_key).update(
+                        session_data=data, expire_date=expire_date,
+                    )
+                    if not updated:
+                        deleted.add(session_key)
+
+            # 只移除写入期间没有再被修改的记录；已删除的 Session 直接丢弃
+            with self._lock:
+                for session_key, entry in pending.items():
+                    if session_key in deleted or self._dirty.get(session_key) is entry:
+                        self._dirty.pop(session_key, None)
+            return len(pending)
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._flush_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='session-flush', daemon=True)
+                self._worker.start()
+                # 进程退出前写回剩余的 Session
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+
+buffer = SessionWriteBuffer(getattr(settings, 'SESSION_FLUSH_INTERVAL', 5))
+
+
+class SessionStore(DBStore):
+    """
+    在数据库 Session 的基础上：
+
+    - 内容没有变化的 save() 直接跳过，不重写整行；
+    - 只有计数器（SESSION_BUFFERED_KEYS）变化时先写入内存缓冲区，由后台线程批量写回数据库；
+      其他改动（登录信息等）立即写入数据库；
+    - clear_expired() 分批删除过期 Session，避免一次性大范围删除。
+    """
+    CLEAR_EXPIRED_BATCH_SIZE = 1000
+    BUFFERED_KEYS = frozenset(getattr(settings, 'SESSION_BUFFERED_KEYS', ()))
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_payload = None
+        self._loaded_expiry = None
+
+    def _payload(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        entry = buffer.get(self.session_key) if self.session_key else None
+        if entry is not None:
+            payload, expire_date = entry
+            data = self.serializer().loads(payload)
+        else:
+            s = self._get_session_from_db()
+            if s is None:
+                return {}
+            data = self.decode(s.session_data)
+            payload, expire_date = self._payload(data), s.expire_date
+        self._loaded_payload, self._loaded_expiry = payload, expire_date
+        return data
+
+    def exists(self, session_key):
+        return buffer.get(session_key) is not None or super().exists(session_key)
+
+    def save(self, must_create=False):
+        if self.session_key is None or must_create:
+            # 新建 Session 需立即写入数据库，以保证 session_key 唯一
+            super().save(must_create=must_create)
+            self._remember_saved()
+            return
+
+        data = self._get_session()
+        payload = self._payload(data)
+        expire_date = self.get_expiry_date()
+        changed = self._changed_keys(data)
+        if self._expiry_is_fresh(expire_date):
+            if not changed:
+                return
+            if changed <= self.BUFFERED_KEYS:
+                buffer.put(self.session_key, payload, expire_date)
+                self._loaded_payload, self._loaded_expiry = payload, expire_date
+                return
+
+        buffer.write_through(self.session_key, super().save)
+        self._remember_saved()
+
+    def _changed_keys(self, data):
+        # 与载入时的内容比较（而不是与 data 本身），嵌套字典被原地修改时同样能发现变化
+        loaded = self.serializer().loads(self._loaded_payload) if self._loaded_payload else {}
+        missing = object()
+        return {key for key in data.keys() | loaded.keys() if data.get(key, missing) != loaded.get(key, missing)}
+
+    def _remember_saved(self):
+        self._loaded_payload = self._payload(self._get_session())
+        self._loaded_expiry = self.get_expiry_date()
+
+    def _expiry_is_fresh(self, expire_date):
+        # 过期时间只有在剩余有效期不足一半时才需要刷新
+        if self._loaded_expiry is None:
+            return False
+        remaining = (self._loaded_expiry - timezone.now()).total_seconds()
+        return remaining > self.get_expiry_age() / 2 and self._loaded_expiry <= expire_date
+
+    def delete(self, session_key=None):
+        buffer.discard(session_key or self.session_key)
+        super().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        buffer.purge_expired()
+        model = cls.get_model_class()
+        now = timezone.now()
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:cls.CLEAR_EXPIRED_BATCH_SIZE]
+            )
+            if not keys:
+                break
+            model.objects.filter(pk__in=keys).delete()
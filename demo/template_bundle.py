@@ -0,0 +1,87 @@
+import json
+import os
+from time import perf_counter_ns
+
+from django.conf import settings
+from django.template import Template, TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+
+# MARK: - 模板预编译
+def iter_templates():
+    """
+    遍历 DjangoTemplates 引擎的模板目录（DIRS 与各 app 的 templates 目录），
+    返回 (模板名, 文件路径)。同名模板只取第一个，与加载器的查找顺序一致。
+    """
+    seen = set()
+    for backend in engines.all():
+        if not hasattr(backend, 'engine'):
+            continue
+        # 配置了 loaders 时 APP_DIRS 须为 False，template_dirs 不含 app 目录
+        for directory in (*backend.engine.dirs, *get_app_template_dirs('templates')):
+            for root, _, files in os.walk(directory):
+                for filename in sorted(files):
+                    path = os.path.join(root, filename)
+                    name = os.path.relpath(path, directory).replace(os.sep, '/')
+                    if name not in seen:
+                        seen.add(name)
+                        yield backend, name, path
+
+
+def compile_templates():
+    """编译所有模板，返回 {模板名: {'path', 'parse_ms', 'error'}}"""
+    results = {}
+    for backend, name, path in iter_templates():
+        try:
+            with open(path, encoding=backend.engine.file_charset) as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            # 模板目录中的图片等非文本文件
+            continue
+
+        start = perf_counter_ns()
+        error = None
+        try:
+            Template(source, engine=backend.engine)
+        except TemplateSyntaxError as exc:
+            error = str(exc)
+        results[name] = {
+            'path': path,
+            'parse_ms': round((perf_counter_ns() - start) / 1e6, 3),
+            'error': error,
+        }
+    return results
+
+
+def bundle_path():
+    return getattr(settings, 'TEMPLATE_BUNDLE', None)
+
+
+def write_bundle(results):
+    names = sorted(name for name, result in results.items() if result['error'] is None)
+    with open(bundle_path(), 'w') as f:
+        json.dump({'templates': names}, f, indent=2)
+    return names
+
+
+def warm_templates():
+    """
+    worker 启动时按清单加载模板，使缓存加载器在第一个请求之前就持有编译好的模板。
+    未启用缓存加载器或清单不存在时什么也不做。返回预热的模板数量。
+    """
+    path = bundle_path()
+    if not getattr(settings, 'TEMPLATE_CACHED_LOADER', False) or not path or not os.path.exists(path):
+        return 0
+
+    with open(path) as f:
+        names = json.load(f)['templates']
+    warmed = 0
+    for backend in engines.all():
+        for name in names:
+            try:
+                backend.get_template(name)
+            except Exception:
+                # 清单生成后模板被删除或改错，留给请求时再报错
+                continue
+            warmed += 1
+    return warmed
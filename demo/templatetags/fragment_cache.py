@@ -0,0 +1,61 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from demo.caching import fragment_stats, model_versions
+from djangoKnowledgeBase.routers import force_primary
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, vary_on, models):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+        self.models = models
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        if self.models:
+            vary_on.append(model_versions(self.models))
+        cache_key = make_template_fragment_key(self.fragment_name, vary_on)
+
+        value = cache.get(cache_key)
+        fragment_stats.record(self.fragment_name, value is not None)
+        if value is None:
+            # 从主库读取，避免从库落后时把旧数据存到新版本号下
+            with force_primary():
+                value = self.nodelist.render(context)
+            cache.set(cache_key, value, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 600))
+        return value
+
+
+@register.tag('cache_fragment')
+def do_cache_fragment(parser, token):
+    """
+    带版本号的模板片段缓存，统计命中率。
+
+        {% load fragment_cache %}
+        {% cache_fragment name [var1 var2 ...] [models="demo.Post,demo.Person"] %}
+            ...
+        {% endcache_fragment %}
+
+    models 中任一模型的数据变化后，片段缓存自动失效。
+    """
+    nodelist = parser.parse(('endcache_fragment',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 2:
+        raise template.TemplateSyntaxError("'%s' tag requires a fragment name." % tokens[0])
+
+    models = ()
+    if len(tokens) > 2 and tokens[-1].startswith('models='):
+        models = tuple(label.strip() for label in tokens.pop()[len('models='):].strip('"\'').split(','))
+    return FragmentCacheNode(
+        nodelist,
+        tokens[1],
+        [parser.compile_filter(t) for t in tokens[2:]],
+        models,
+    )
@@ -1,3 +1,679 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.utils import timezone
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.functions import Upper
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image as PILImage
+
+from . import session_backend
+from .checks import check_search_triggers
+from .counters import ViewCounter
+from .derivatives import claim_pending, process_pending
+from .featured import featured_person
+from .pagination import CursorPaginator
+from .polymorphic import resolve_subclasses
+from .models import Baby, Book, Group, Human, Image, MyUser, Owner, Post, UUIDModel, resolve_owners
+from .search import fts_supported, missing_triggers, search_books, search_posts
+from .session_backend import SessionStore, SessionWriteBuffer
+from .uploads import HashingFileUploadHandler, save_images
+from .uuids import UUID7Generator, uuid7
+from .views import uploads_files
+
+
+def make_posts(count, prefix='p'):
+    # 作者一半是用户、一半是群组，每个作者一篇文章
+    posts = []
+    for i in range(count):
+        if i % 2:
+            owner = Owner.objects.create(group=Group.objects.create(username='{}-group-{}'.format(prefix, i)))
+        else:
+            owner = Owner.objects.create(person=MyUser.objects.create(username='{}-user-{}'.format(prefix, i)))
+        posts.append(Post.objects.create(owner=owner, title='S{}-{}'.format(prefix, i), body='body'))
+    return posts
+
+
+class QueryCountTestCase(TestCase):
+    def setUp(self):
+        # 页面缓存、片段缓存与 featured person 缓存都会影响查询次数
+        cache.clear()
+        featured_person.invalidate()
+
+    def assertConstantQueries(self, num, fetch, sizes=(1, 30)):
+        """数据行数从 1 增加到 30，fetch(文章列表) 的查询次数都是 num"""
+        posts = []
+        for size in sizes:
+            posts += make_posts(size - len(posts), prefix='n{}'.format(size))
+            cache.clear()
+            featured_person.invalidate()
+            with self.subTest(rows=size), self.assertNumQueries(num):
+                fetch(posts)
+
+
+# MARK: - 阅读量缓冲计数
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        # 不启动后台线程，由测试控制刷新时机
+        self.counter = ViewCounter('demo.Post', 'views', shards=4, flush_interval=None, flush_size=10 ** 9, batch_size=2)
+        self.posts = make_posts(5)
+
+    def test_concurrent_increments(self):
+        def work():
+            for post in self.posts:
+                for _ in range(100):
+                    self.counter.incr(post.pk)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([self.counter.pending(post.pk) for post in self.posts], [800] * 5)
+
+    def test_flush_writes_totals_in_batches(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(views=10)
+        for i, post in enumerate(self.posts):
+            self.counter.incr(post.pk, i + 1)
+
+        # 5 行、每批 2 行：3 条 UPDATE ... CASE WHEN
+        with self.assertNumQueries(3):
+            self.assertEqual(self.counter.flush(), 5)
+        views = dict(Post.objects.values_list('pk', 'views'))
+        self.assertEqual([views[post.pk] for post in self.posts], [11, 2, 3, 4, 5])
+        self.assertEqual(self.counter.pending(self.posts[0].pk), 0)
+        self.assertEqual(self.counter.flush(), 0)
+
+    def test_pending_is_per_post(self):
+        self.counter.incr(self.posts[0].pk, 3)
+        self.counter.incr(self.posts[1].pk)
+        self.assertEqual([self.counter.pending(post.pk) for post in self.posts], [3, 1, 0, 0, 0])
+
+    def test_flush_size_triggers_flush(self):
+        self.counter.flush_size = 3
+        for _ in range(3):
+            self.counter.incr(self.posts[0].pk)
+        self.assertEqual(Post.objects.get(pk=self.posts[0].pk).views, 3)
+        self.assertEqual(self.counter.pending(self.posts[0].pk), 0)
+
+
+# MARK: - 游标分页
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        owner = Owner.objects.create(group=Group.objects.create(username='g'))
+        now = timezone.now()
+        # 每三篇文章的 created 相同
+        Post.objects.bulk_create([
+            Post(owner=owner, title='t{}'.format(i), created=now - timedelta(seconds=i // 3))
+            for i in range(25)
+        ])
+        self.expected = list(Post.objects.order_by('-created', '-id').values_list('pk', flat=True))
+        self.paginator = CursorPaginator(Post.objects.all(), 4)
+
+    def test_walks_every_row_once_across_ties(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = self.paginator.get_page(cursor)
+            seen += [post.pk for post in page]
+            pages += 1
+            self.assertEqual(page.has_previous, cursor is not None)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 7)
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.get(pk=self.expected[5])
+        created, pk = CursorPaginator.decode_cursor(CursorPaginator.encode_cursor(post))
+        self.assertEqual((created, pk), (post.created, post.pk))
+        page = self.paginator.get_page(CursorPaginator.encode_cursor(post))
+        self.assertEqual([p.pk for p in page], self.expected[6:10])
+
+    def test_invalid_cursor_returns_first_page(self):
+        first = [post.pk for post in self.paginator.get_page()]
+        for cursor in ('', 'not-base64!', 'W10', 'WyJ4IiwgMV0', 'WyIyMDIwLTAxLTAxIiwgIjEiXQ'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator.get_page(cursor)
+                self.assertEqual([post.pk for post in page], first)
+                self.assertIsNone(page.cursor)
+
+
+# MARK: - 页面查询次数
+class ViewQueryTests(QueryCountTestCase):
+    # 首页与 JSON 列表按创建时间倒序分页，最新的文章一定在第一页
+
+    def test_home(self):
+        # ETag 聚合 + featured person + 一页文章
+        self.assertConstantQueries(3, lambda posts: self.assertContains(self.client.get('/'), posts[-1].title))
+
+    def test_home_with_context(self):
+        # 没有条件请求，只有 featured person + 一页文章
+        url = reverse('demo:home_with_context', args=(1,))
+        self.assertConstantQueries(2, lambda posts: self.assertContains(self.client.get(url), posts[-1].title))
+
+    def test_post_detail(self):
+        # 条件请求只读 updated + 一次 JOIN 取回文章与作者
+        self.assertConstantQueries(
+            2, lambda posts: self.assertContains(self.client.get(reverse('demo:detail', args=(posts[0].id,))), 'user-0')
+        )
+
+    def test_redirect_by_view(self):
+        self.assertConstantQueries(
+            2, lambda posts: self.assertContains(
+                self.client.get(reverse('demo:redirect_view', args=(posts[0].id,))), 'user-0'
+            )
+        )
+
+    def test_post_list_api(self):
+        url = reverse('demo:post_list_api')
+        self.assertConstantQueries(1, lambda posts: self.assertContains(self.client.get(url), posts[-1].title))
+
+
+# MARK: - 异步视图
+class AsyncViewTests(TransactionTestCase):
+    # 异步视图的查询在 sync_to_async 的线程中执行，看不到 TestCase 未提交的数据
+
+    def setUp(self):
+        cache.clear()
+        self.post, = make_posts(1)
+        self.urls = [
+            reverse('demo:async_home'),
+            reverse('demo:async_detail', args=(self.post.id,)),
+            reverse('demo:async_post_list_api'),
+        ]
+
+    def test_get_under_wsgi(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), self.post.title)
+
+    def test_other_methods_under_wsgi(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url).status_code, 405)
+                response = self.client.options(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('GET', response['Allow'])
+
+    async def test_methods_under_asgi(self):
+        client = AsyncClient()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual((await client.get(url)).status_code, 200)
+                self.assertEqual((await client.post(url)).status_code, 405)
+                self.assertEqual((await client.options(url)).status_code, 200)
+
+
+# MARK: - Owner 批量解析与冗余作者名
+class OwnerDisplayNameTests(TestCase):
+    def test_resolve_owners(self):
+        make_posts(6)
+        posts = list(Post.objects.all())
+        # Owner + 用户 + 群组
+        with self.assertNumQueries(3):
+            resolve_owners(posts)
+        with self.assertNumQueries(0):
+            names = [post.owner.get_owner().username for post in posts]
+        self.assertEqual(names, [post.owner_display_name for post in posts])
+
+    def test_rename_updates_posts(self):
+        post, = make_posts(1)
+        user = post.owner.person
+        user.username = 'renamed'
+        user.save()
+        post.refresh_from_db()
+        self.assertEqual(post.owner_display_name, 'renamed')
+        self.assertEqual(str(Owner.objects.get(pk=post.owner_id)), 'renamed')
+
+    def test_reassign_owner_updates_posts(self):
+        post, = make_posts(1)
+        owner = post.owner
+        owner.person = MyUser.objects.create(username='bob')
+        owner.save()
+        post.refresh_from_db()
+        self.assertEqual(post.owner_display_name, 'bob')
+
+    def test_last_login_save_skips_sync(self):
+        post, = make_posts(1)
+        user = post.owner.person
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+
+
+class AdminChangelistQueryTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = MyUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin)
+
+    def test_post_changelist(self):
+        url = reverse('admin:demo_post_changelist')
+        # Session + 用户 + 两次 count + 文章列表；作者名来自冗余列，不查询 Owner / 用户 / 群组
+        # （登录信息直接写入数据库，Session 不在延迟写入的缓冲区中）
+        self.assertConstantQueries(5, lambda posts: self.assertContains(self.client.get(url), 'user-0'))
+
+    def test_owner_changelist(self):
+        url = reverse('admin:demo_owner_changelist')
+        self.assertConstantQueries(5, lambda posts: self.assertContains(self.client.get(url), 'user-0'))
+
+
+# MARK: - 延迟写入的 Session
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        # 独立的缓冲区；后台线程一小时后才写回，不会在测试中途自动 flush
+        self.buffer = SessionWriteBuffer(3600)
+        patcher = mock.patch.object(session_backend, 'buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        session = SessionStore()
+        session['visits_count'] = 0
+        session.create()
+        self.session_key = session.session_key
+
+    def stored(self):
+        return SessionStore().decode(Session.objects.get(pk=self.session_key).session_data)
+
+    def test_counter_change_is_buffered(self):
+        session = SessionStore(self.session_key)
+        session['visits_count'] += 1
+        with self.assertNumQueries(0):
+            session.save()
+        self.assertEqual(self.stored()['visits_count'], 0)
+        self.assertEqual(SessionStore(self.session_key)['visits_count'], 1)
+
+        self.buffer.flush()
+        self.assertEqual(self.stored()['visits_count'], 1)
+
+    def test_nested_counter_mutated_in_place(self):
+        session = SessionStore(self.session_key)
+        session['deeper_count'] = {'num': 1}
+        session.save()
+        session = SessionStore(self.session_key)
+        session['deeper_count']['num'] += 1
+        session.modified = True
+        session.save()
+        self.assertEqual(SessionStore(self.session_key)['deeper_count'], {'num': 2})
+
+    def test_unchanged_save_skips_write(self):
+        session = SessionStore(self.session_key)
+        session.get('visits_count')
+        session.save()
+        self.assertIsNone(self.buffer.get(self.session_key))
+
+    def test_other_keys_are_written_through(self):
+        # 先有一次缓冲的计数，再修改其他 key：整个 Session 立即写入数据库，缓冲区中的旧数据丢弃
+        session = SessionStore(self.session_key)
+        session['visits_count'] = 5
+        session.save()
+        session = SessionStore(self.session_key)
+        session['cart'] = [1, 2]
+        session.save()
+
+        self.assertEqual(self.stored(), {'visits_count': 5, 'cart': [1, 2]})
+        self.assertIsNone(self.buffer.get(self.session_key))
+        self.buffer.flush()
+        self.assertEqual(self.stored(), {'visits_count': 5, 'cart': [1, 2]})
+
+    def test_login_is_written_to_database(self):
+        user = MyUser.objects.create(username='session-user')
+        self.client.force_login(user)
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        data = SessionStore().decode(Session.objects.get(pk=session_key).session_data)
+        self.assertEqual(data[SESSION_KEY], str(user.pk))
+
+
+# MARK: - 批量上传
+class UploadTests(TestCase):
+    FILE_SIZE = 2 * 1024 * 1024
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = self.settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def make_file(self, name, seed):
+        # 每个文件内容由 seed 决定，seed 相同即内容相同
+        return SimpleUploadedFile(name, seed.to_bytes(4, 'big') * (self.FILE_SIZE // 4), 'image/png')
+
+    def upload(self, files):
+        request = RequestFactory().post(reverse('demo:uploads'), {'file_field': files})
+        request._dont_enforce_csrf_checks = True
+        request.user = AnonymousUser()
+        # 关闭（并删除）未被移动到 MEDIA_ROOT 的临时文件
+        self.addCleanup(request.close)
+        return request
+
+    def test_streams_files_with_bounded_memory(self):
+        # 100 个 2MB 文件（共 200MB），其中 20 个与其他文件内容相同
+        files = [self.make_file('img{}.png'.format(i), i % 80) for i in range(100)]
+        request = self.upload(files)
+
+        tracemalloc.start()
+        try:
+            response = uploads_files(request)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.objects.count(), 80)
+        # 内存峰值与单个文件、文件总数无关，只取决于分块大小
+        self.assertLess(peak, self.FILE_SIZE)
+
+    def test_spools_to_temporary_files(self):
+        request = self.upload([self.make_file('a.png', 1)])
+        request.upload_handlers = [HashingFileUploadHandler(request)]
+        f, = request.FILES.getlist('file_field')
+        self.assertIsInstance(f, TemporaryUploadedFile)
+        self.assertEqual(f.content_hash, hashlib.sha256(f.read()).hexdigest())
+
+    def test_deduplicates_and_bulk_inserts(self):
+        def parsed(files):
+            request = self.upload(files)
+            request.upload_handlers = [HashingFileUploadHandler(request)]
+            return request.FILES.getlist('file_field')
+
+        self.assertEqual(save_images(parsed([self.make_file('a.png', 1)])), 1)
+
+        # 批次内重复 + 与已有记录重复
+        files = parsed([
+            self.make_file(name, seed) for name, seed in (('a.png', 1), ('b.png', 2), ('c.png', 2), ('d.png', 3))
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            created = save_images(files)
+        self.assertEqual(created, 2)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Image.objects.count(), 3)
+        # 重复的文件不会留在 MEDIA_ROOT 中
+        stored = [name for _, _, names in os.walk(self.media_root) for name in names]
+        self.assertEqual(len(stored), 3)
+
+
+# MARK: - 缩略图
+class ReclaimingExecutor:
+    """同步执行任务；提交时模拟租期已过、图片被另一个 worker 重新领取"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        fn(*args)
+        Image.objects.update(claimed_at=timezone.now() + timedelta(seconds=1))
+        future.set_result(None)
+        return future
+
+
+class DerivativeTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = self.settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def make_image(self, name='photo.png', size=(2000, 1000), **kwargs):
+        path = os.path.join(self.media_root, 'images', name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        PILImage.new('RGB', size, 'red').save(path, 'PNG')
+        return Image.objects.create(image='images/' + name, **kwargs)
+
+    def variant_width(self, field_file):
+        with PILImage.open(field_file.path) as variant:
+            return variant.width
+
+    def test_process_pending_writes_variants(self):
+        image = self.make_image()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(process_pending(executor), 1)
+            self.assertEqual(process_pending(executor), 0)
+
+        image.refresh_from_db()
+        self.assertEqual(image.variant_status, Image.DONE)
+        self.assertEqual(self.variant_width(image.thumbnail), 320)
+        self.assertEqual(self.variant_width(image.medium), 960)
+        self.assertIn('_{}_'.format(image.pk), image.thumbnail.name)
+
+    def test_unreadable_image_fails(self):
+        image = self.make_image()
+        with open(image.image.path, 'wb') as f:
+            f.write(b'not an image')
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            process_pending(executor)
+        image.refresh_from_db()
+        self.assertEqual(image.variant_status, Image.FAILED)
+        self.assertFalse(image.thumbnail)
+
+    def test_claim_respects_lease(self):
+        now = timezone.now()
+        pending = self.make_image('a.png')
+        running = self.make_image('b.png', variant_status=Image.PROCESSING, claimed_at=now)
+        expired = self.make_image('c.png', variant_status=Image.PROCESSING, claimed_at=now - timedelta(seconds=120))
+        # 加入租期之前遗留的处理中任务，没有领取时间
+        legacy = self.make_image('d.png', variant_status=Image.PROCESSING)
+
+        claimed = claim_pending(10, lease=60)
+        self.assertEqual(sorted(image.pk for image in claimed), [pending.pk, expired.pk, legacy.pk])
+        self.assertTrue(all(image.claimed_at >= now for image in claimed))
+        running.refresh_from_db()
+        self.assertEqual(running.claimed_at, now)
+        # 刚领取的任务不会被再次领取
+        self.assertEqual(claim_pending(10, lease=60), [])
+
+    def test_stale_worker_does_not_overwrite_reclaimed_image(self):
+        image = self.make_image()
+        process_pending(ReclaimingExecutor())
+        image.refresh_from_db()
+        self.assertEqual(image.variant_status, Image.PROCESSING)
+        self.assertFalse(image.thumbnail)
+
+    def test_command_leaves_live_claims_alone(self):
+        image = self.make_image('a.png')
+        running = self.make_image('b.png', variant_status=Image.PROCESSING, claimed_at=timezone.now())
+        out = StringIO()
+        call_command('process_images', once=True, workers=1, stdout=out)
+
+        self.assertIn('已处理 1 张图片', out.getvalue())
+        image.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(image.variant_status, Image.DONE)
+        self.assertEqual(running.variant_status, Image.PROCESSING)
+
+
+# MARK: - 全文搜索
+class SearchTests(TestCase):
+    def test_short_terms_also_match_body(self):
+        # 不足 3 个字符的词走 LIKE 回退，同样搜索正文
+        post, = make_posts(1)
+        Post.objects.filter(pk=post.pk).update(body='含有 xy 的正文')
+        self.assertEqual([p.pk for p in search_posts('xy')], [post.pk])
+
+    def test_full_text_matches_title_and_body(self):
+        post, = make_posts(1)
+        post.body = 'django knowledge base'
+        post.save()
+        self.assertEqual([p.pk for p in search_posts('knowledge')], [post.pk])
+        self.assertEqual([p.pk for p in search_posts(post.title)], [post.pk])
+
+    def test_book_title_search(self):
+        book = Book.objects.create(title='Two Scoops of Django')
+        self.assertEqual([b.pk for b in search_books('scoops')], [book.pk])
+        book.title = 'Fluent Python'
+        book.save()
+        self.assertEqual(search_books('scoops'), [])
+        self.assertEqual([b.pk for b in search_books('fluent')], [book.pk])
+
+
+@skipUnless(fts_supported(connection), '需要 SQLite 3.34+ 的 FTS5 trigram 分词器')
+class SearchTriggerTests(TestCase):
+    def test_migrations_keep_sync_triggers(self):
+        # 0016、0018 的 AddField 重建了 demo_book、demo_post，触发器应已补建
+        self.assertEqual(missing_triggers(connection), [])
+        self.assertEqual(check_search_triggers(None, databases=['default']), [])
+
+    def test_rebuild_restores_dropped_triggers(self):
+        # 模拟表结构迁移重建 demo_post 后丢失触发器
+        post, = make_posts(1)
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER demo_post_fts_au')
+        self.assertEqual(missing_triggers(connection), ['demo_post_fts_au'])
+        warning, = check_search_triggers(None, databases=['default'])
+        self.assertEqual(warning.id, 'demo.W001')
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(missing_triggers(connection), [])
+        post.title = 'renamed after rebuild'
+        post.save()
+        self.assertEqual([p.pk for p in search_posts('renamed')], [post.pk])
+
+
+# MARK: - UUIDv7 主键
+class UUID7Tests(SimpleTestCase):
+    def test_version_and_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertTrue(before <= value.int >> 80 <= after)
+
+    def test_strictly_increasing(self):
+        values = [uuid7() for _ in range(10000)]
+        self.assertEqual(values, sorted(set(values)))
+        # 按字节比较与 SQLite 的 BLOB 排序一致
+        self.assertEqual([v.bytes for v in values], sorted(v.bytes for v in values))
+
+    def test_sequence_overflow_borrows_next_millisecond(self):
+        generator = UUID7Generator()
+        with mock.patch('demo.uuids.time.time_ns', return_value=1_700_000_000_000 * 1_000_000):
+            values = [generator() for _ in range(5000)]
+        self.assertEqual(values, sorted(set(values)))
+        self.assertGreater(values[-1].int >> 80, 1_700_000_000_000)
+
+    def test_clock_going_backwards(self):
+        generator = UUID7Generator()
+        with mock.patch('demo.uuids.time.time_ns', side_effect=[2_000_000_000, 1_000_000_000, 1_000_000]):
+            values = [generator() for _ in range(3)]
+        self.assertEqual(values, sorted(set(values)))
+
+
+class BinaryUUIDFieldTests(TestCase):
+    def test_stored_as_16_bytes(self):
+        obj = UUIDModel.objects.create()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT typeof(id), length(id) FROM demo_uuidmodel')
+            self.assertEqual(cursor.fetchall(), [('blob', 16)])
+        self.assertEqual(UUIDModel.objects.get(pk=obj.pk).pk, obj.pk)
+        self.assertEqual(UUIDModel.objects.get(pk=str(obj.pk)).pk, obj.pk)
+        self.assertEqual(list(UUIDModel.objects.values_list('pk', flat=True)), [obj.pk])
+
+    def test_ordered_by_creation(self):
+        created = [UUIDModel.objects.create().pk for _ in range(20)]
+        self.assertEqual(list(UUIDModel.objects.order_by('pk').values_list('pk', flat=True)), created)
+
+
+class UUIDMigrationTests(TransactionTestCase):
+    before = [('demo', '0016_book_has_again')]
+    after = [('demo', '0017_uuidmodel_uuid7_blob')]
+
+    def setUp(self):
+        self.addCleanup(self.migrate, None)
+        self.migrate(self.before)
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        if targets is None:
+            targets = executor.loader.graph.leaf_nodes()
+        executor.migrate(targets)
+
+    def rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT typeof(id), content FROM demo_uuidmodel ORDER BY content')
+            return cursor.fetchall()
+
+    def test_hex_keys_converted_to_bytes(self):
+        old = uuid.uuid1()
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO demo_uuidmodel (id, content) VALUES (%s, %s)', [old.hex, 'uuid1'])
+
+        self.migrate(self.after)
+        self.assertEqual(self.rows(), [('blob', 'uuid1')])
+        # 已有主键保持原值
+        self.migrate(None)
+        self.assertEqual(UUIDModel.objects.get(pk=old).content, 'uuid1')
+
+    def test_reverse_restores_hex(self):
+        self.migrate(self.after)
+        self.migrate(None)
+        obj = UUIDModel.objects.create(content='uuid7')
+
+        self.migrate(self.before)
+        self.assertEqual(self.rows(), [('text', 'uuid7')])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM demo_uuidmodel')
+            self.assertEqual(cursor.fetchone()[0], obj.pk.hex)
+
+
+# MARK: - 多表继承的子类解析
+class ResolveSubclassesTests(TestCase):
+    def make_humans(self, count, start=0):
+        # 每三个中有一个是 Baby
+        for i in range(start, count):
+            if i % 3:
+                Human.objects.create(name='h{}'.format(i))
+            else:
+                Baby.objects.create(name='h{}'.format(i), age=i)
+
+    def test_constant_queries(self):
+        for size in (3, 30):
+            self.make_humans(size, start=Human.objects.count())
+            with self.subTest(rows=size), self.assertNumQueries(2):
+                humans = list(Human.objects.order_by('pk').resolve_subclasses())
+            self.assertEqual([type(h) for h in humans], [Baby, Human, Human] * (size // 3))
+            with self.assertNumQueries(0):
+                self.assertEqual([h.age for h in humans[::3]], list(range(0, size, 3)))
+
+    def test_keeps_order_and_annotations(self):
+        self.make_humans(6)
+        humans = list(Human.objects.annotate(upper=Upper('name')).order_by('-pk').resolve_subclasses())
+        self.assertEqual([h.name for h in humans], ['h5', 'h4', 'h3', 'h2', 'h1', 'h0'])
+        self.assertEqual([h.upper for h in humans], ['H5', 'H4', 'H3', 'H2', 'H1', 'H0'])
+
+    def test_iterator_resolves_each_chunk(self):
+        self.make_humans(10)
+        # 1 次父类查询 + 每个分块 1 次 Baby 查询
+        with self.assertNumQueries(4):
+            humans = list(Human.objects.order_by('pk').resolve_subclasses().iterator(chunk_size=4))
+        self.assertEqual([type(h) for h in humans], [Baby, Human, Human] * 3 + [Baby])
+
+    def test_keeps_related_caches(self):
+        self.make_humans(1)
+        parent = Human.objects.get()
+        parent._state.fields_cache['owner'] = 'cached owner'
+        parent._prefetched_objects_cache = {'posts': ['cached post']}
+
+        baby, = resolve_subclasses([parent])
+        self.assertIsInstance(baby, Baby)
+        self.assertEqual(baby._state.fields_cache['owner'], 'cached owner')
+        self.assertEqual(baby._prefetched_objects_cache, {'posts': ['cached post']})
@@ -0,0 +1,78 @@
+import hashlib
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+
+from .models import Image
+
+
+# MARK: - 流式上传
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    上传数据按块直接写入临时文件，不在内存中保留整个文件，
+    同时边写边计算 sha256，用于按内容去重。
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.content_hash = self.hasher.hexdigest()
+        return file
+
+
+def save_images(files):
+    """
+    保存一批上传的图片，返回新增的数量。
+
+    内容相同的文件（包括数据库中已有的）只保存一份；
+    所有 Image 行在一个事务里用 bulk_create 一次写入。
+    """
+    field = Image._meta.get_field('image')
+    storage = field.storage
+
+    # 同一批次内去重
+    by_hash = {}
+    for f in files:
+        by_hash.setdefault(f.content_hash, f)
+
+    existing = set(
+        Image.objects.filter(content_hash__in=list(by_hash)).values_list('content_hash', flat=True)
+    )
+
+    images = []
+    try:
+        for content_hash, f in by_hash.items():
+            if content_hash in existing:
+                continue
+            image = Image(content_hash=content_hash)
+            # 临时文件与 MEDIA_ROOT 在同一文件系统时，这里只是一次 rename
+            image.image.name = storage.save(field.generate_filename(image, f.name), f, max_length=field.max_length)
+            images.append(image)
+
+        with transaction.atomic():
+            # 并发上传相同内容时，由唯一约束兜底
+            Image.objects.bulk_create(images, ignore_conflicts=True)
+    except Exception:
+        for image in images:
+            storage.delete(image.image.name)
+        raise
+
+    # 被唯一约束忽略的行，删除已保存的重复文件
+    saved = dict(
+        Image.objects.filter(content_hash__in=[image.content_hash for image in images])
+        .values_list('content_hash', 'image')
+    )
+    created = 0
+    for image in images:
+        if saved.get(image.content_hash) == image.image.name:
+            created += 1
+        else:
+            storage.delete(image.image.name)
+    return created
@@ -5,9 +5,16 @@ from .views import (
     RedirectView,
     PostDetailView,
     redirect_view,
+    post_view_beacon,
+    post_search,
     path_demo_view,
     uploads_files,
     session_visits_count,
+    post_list_api,
+    post_qs_list_api,
+    AsyncHomePageView,
+    AsyncPostDetailView,
+    AsyncPostListView,
 )
 
 app_name = 'demo'
@@ -38,6 +45,11 @@ urlpatterns = [
     path('redirect-by-view/<int:id>/', redirect_view, name='redirect_view'),
     # 被跳转 url
     path('post-detail/<int:id>/', PostDetailView.as_view(), name='detail'),
+    # 阅读量 beacon
+    path('post-detail/<int:id>/view/', post_view_beacon, name='view_beacon'),
+
+    # MARK: - 全文搜索
+    path('search/', post_search, name='search'),
 
     # MARK: - path()
     path('path/<int:count>/<str:salute>/', path_demo_view, name='path'),
@@ -47,4 +59,13 @@ urlpatterns = [
 
     # MARK: - Session
     path('visits-count/', session_visits_count, name='visits_count'),
+
+    # MARK: - 游标分页
+    path('api/posts/', post_list_api, name='post_list_api'),
+    path('api/posts-qs/', post_qs_list_api, name='post_qs_list_api'),
+
+    # MARK: - 异步视图
+    path('async/', AsyncHomePageView.as_view(), name='async_home'),
+    path('async/post-detail/<int:id>/', AsyncPostDetailView.as_view(), name='async_detail'),
+    path('async/api/posts/', AsyncPostListView.as_view(), name='async_post_list_api'),
 ]
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+import uuid
+
+from django.db import models
+
+
+# MARK: - UUIDv7
+class UUID7Generator:
+    """
+    按时间递增的 UUIDv7（RFC 9562）：48 位毫秒时间戳 + 12 位序号 + 62 位随机数。
+
+    同一毫秒内序号递增，保证同一进程生成的 UUID 严格递增，
+    新行总是追加在 B 树的末尾，不会像 uuid1 / uuid4 那样随机插入导致页分裂。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._seq = 0
+
+    def __call__(self):
+        ms = time.time_ns() // 1_000_000
+        rand = int.from_bytes(os.urandom(8), 'big')
+        with self._lock:
+            if ms > self._last_ms:
+                # 新的毫秒从较小的随机序号开始，留出递增空间
+                self._last_ms = ms
+                self._seq = rand >> 53
+            else:
+                self._seq += 1
+                if self._seq > 0xFFF:
+                    # 序号用完（或时钟回拨）时借用下一毫秒
+                    self._last_ms += 1
+                    self._seq = 0
+            ms, seq = self._last_ms, self._seq
+
+        value = (ms << 80) | (0x7 << 76) | (seq << 64) | (0b10 << 62) | (rand & 0x3FFF_FFFF_FFFF_FFFF)
+        return uuid.UUID(int=value)
+
+
+_generator = UUID7Generator()
+
+
+def uuid7():
+    # 字段 default 需要是模块级函数，迁移文件才能序列化
+    return _generator()
+
+
+# MARK: - 16 字节存储
+def stores_bytes(connection):
+    # 只有 djangoKnowledgeBase.sqlite3 后端能把 BLOB 读回 UUID
+    return getattr(connection.features, 'has_binary_uuid_field', False)
+
+
+class BinaryUUIDField(models.UUIDField):
+    """
+    以 16 字节 BLOB 保存的 UUIDField（SQLite 上 UUIDField 默认为 char(32) 文本）。
+
+    需要 djangoKnowledgeBase.sqlite3 后端（connection.features.has_binary_uuid_field），
+    由它把读出的字节转换成 UUID；其他后端沿用 UUIDField 的原生类型和转换。
+    """
+
+    def db_type(self, connection):
+        if stores_bytes(connection):
+            return 'blob'
+        return super().db_type(connection)
+
+    def rel_db_type(self, connection):
+        return self.db_type(connection)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not stores_bytes(connection):
+            return super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = self.to_python(value)
+        return value.bytes
+
+    def to_python(self, value):
+        if isinstance(value, bytes) and len(value) == 16:
+            return uuid.UUID(bytes=value)
+        return super().to_python(value)
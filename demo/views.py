@@ -1,20 +1,49 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from django.views.generic import View
 from django.urls import reverse
 from django.shortcuts import redirect, get_object_or_404
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_POST
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
+
+from djangoKnowledgeBase.routers import force_primary
+
 
-from .models import Post, Person, Image
+from .models import Post, Image, PostQS
+from .pagination import CursorPaginator
+from .uploads import HashingFileUploadHandler, save_images
+from .featured import featured_person
+from .caching import cache_page_for_anonymous
+from .conditional import conditional_listing, conditional_post
+from .counters import view_counter
+from .search import search_books, search_posts
 
 
 # MARK: - reverse()
 
 # 首页view
 class HomePageView(View):
+    # 浏览器每次都重新验证，未变化时返回 304；
+    # 页面含有 {% csrf_token %}，按 CSRF Cookie 分别缓存
+    @method_decorator([
+        cache_control(private=True, no_cache=True),
+        conditional_listing,
+        cache_page_for_anonymous(('demo.Post', 'demo.Person'), vary_on_csrf=True),
+    ])
     def get(self, request):
-        posts = Post.objects.all()
+        # posts = Post.objects.all()
+        # 模板片段缓存命中时不会用到 posts，延迟到渲染时才查询
+        posts = SimpleLazyObject(lambda: get_post_page(request))
 
-        name1, name2 = get_name()
+        name1, name2 = get_name(request)
 
         return render(
             request,
@@ -49,9 +78,9 @@ class HomePageWithContextView(View):
         else:
             context = {'content': '我从 Reverse() 回来'}
 
-        posts = Post.objects.all()
+        posts = SimpleLazyObject(lambda: get_post_page(request))
 
-        name1, name2 = get_name()
+        name1, name2 = get_name(request)
         context.update({'posts': posts, 'name1': name1, 'name2': name2})
         return render(request, 'home.html', context=context)
 
@@ -78,11 +107,12 @@ class RedirectView(View):
 
 # model 跳转
 class PostDetailView(View):
+    @method_decorator([cache_control(private=True, no_cache=True), conditional_post()])
     def get(self, request, *args, **kwargs):
         id = kwargs.get('id')
 
         # post = Post.objects.get(id=id)
-        post = get_object_or_404(Post, id=id)
+        post = get_object_or_404(Post.objects.with_owner(), id=id)
 
         (post, owner) = detail_setup(post)
 
@@ -90,9 +120,11 @@ class PostDetailView(View):
 
 
 # view_name 跳转
+@cache_control(private=True, no_cache=True)
+@conditional_post(Post.objects.filter(title__startswith='S'))
 def redirect_view(request, id):
     # post = Post.objects.get(id=id)
-    queryset = Post.objects.filter(title__startswith='S')
+    queryset = Post.objects.with_owner().filter(title__startswith='S')
     post = get_object_or_404(queryset, id=id)
 
     post, owner = detail_setup(post)
@@ -100,6 +132,28 @@ def redirect_view(request, id):
     return render(request, 'post_detail.html', context={'post': post, 'owner': owner})
 
 
+# 阅读量 beacon：详情页加载后由浏览器发送，返回最新阅读量
+# 详情页因此可以返回 304 而不漏计阅读量
+@csrf_exempt
+@require_POST
+def post_view_beacon(request, id):
+    # 计数只进入内存缓冲区，请求本身没有写库，需显式读主库，否则会读到从库中落后的阅读量
+    with force_primary():
+        views = Post.objects.filter(pk=id).values_list('views', flat=True).first()
+    if views is None:
+        return JsonResponse({'error': 'not found'}, status=404)
+    view_counter.incr(id)
+    return JsonResponse({'views': views + view_counter.pending(id)})
+
+
+# MARK: - 全文搜索
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(query) if query else []
+    books = search_books(query) if query else []
+    return render(request, 'search.html', context={'query': query, 'posts': posts, 'books': books})
+
+
 # MARK: - path()
 def path_demo_view(request, count, salute):
     count = count
@@ -116,18 +170,111 @@ def path_demo_view(request, count, salute):
                   )
 
 
+# MARK: - 游标分页 JSON 接口
+@cache_page_for_anonymous(('demo.Post',))
+def post_list_api(request):
+    page = get_post_page(request)
+    results = [
+        {
+            'id': post.id, 'title': post.title, 'owner': post.owner_display_name,
+            'created': post.created, 'url': post.get_absolute_url(),
+        }
+        for post in page
+    ]
+    return JsonResponse({'results': results, 'next': page.next_cursor})
+
+
+def post_qs_list_api(request):
+    queryset = PostQS.objects.only('id', 'title', 'created', 'owner_id')
+    page = CursorPaginator(queryset, settings.POSTS_PER_PAGE).get_page(request.GET.get('cursor'))
+    results = [
+        {'id': post.id, 'title': post.title, 'created': post.created, 'owner': post.owner_id}
+        for post in page
+    ]
+    return JsonResponse({'results': results, 'next': page.next_cursor})
+
+
+# MARK: - 异步视图
+class AsyncView(View):
+    """
+    异步类视图基类。
+
+    Django 3.1 的 as_view() 返回的是同步函数，需要手动标记为协程函数，
+    ASGI 下才会直接 await，WSGI 下则由 Django 自动 async_to_sync。
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    # dispatch() 的返回值都会被 await，不支持的方法与 OPTIONS 也要返回协程
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+
+class AsyncHomePageView(AsyncView):
+    async def get(self, request):
+        # ORM 仍是同步的：所有查询放在一次 sync_to_async 中完成
+        posts, (name1, name2) = await sync_to_async(load_home)(request)
+
+        return render(
+            request,
+            'home.html',
+            context={'posts': posts, 'name1': name1, 'name2': name2}
+        )
+
+
+class AsyncPostDetailView(AsyncView):
+    async def get(self, request, *args, **kwargs):
+        id = kwargs.get('id')
+
+        post = await sync_to_async(get_object_or_404)(Post.objects.with_owner(), id=id)
+
+        # 阅读量由 beacon 累加，get_owner() 已由 select_related 取回，均不访问数据库
+        (post, owner) = detail_setup(post)
+
+        return render(request, 'post_detail.html', context={'post': post, 'owner': owner})
+
+
+class AsyncPostListView(AsyncView):
+    async def get(self, request):
+        page = await sync_to_async(get_post_page)(request)
+        results = [
+            {'id': post.id, 'title': post.title, 'created': post.created, 'url': post.get_absolute_url()}
+            for post in page
+        ]
+        return JsonResponse({'results': results, 'next': page.next_cursor})
+
+
 # MARK: - 批量上传文件
+@csrf_exempt
 def uploads_files(request):
+    # 必须在读取 request.POST / request.FILES 之前替换上传处理器，
+    # 而 CsrfViewMiddleware 会读取 request.POST，因此 CSRF 校验放到内层视图
+    request.upload_handlers = [HashingFileUploadHandler(request)]
+    return _uploads_files(request)
+
+
+@csrf_protect
+def _uploads_files(request):
     if request.method == 'POST':
 
         # do validate here...
 
         files = request.FILES.getlist('file_field')
-        for f in files:
-            file = Image(image=f)
-            file.save()
+        # for f in files:
+        #     file = Image(image=f)
+        #     file.save()
+        save_images(files)
 
-    return render(request, 'uploads_images.html', context={'images': Image.objects.all()})
+    paginator = Paginator(Image.objects.order_by('-id'), settings.IMAGES_PER_PAGE)
+    images = paginator.get_page(request.GET.get('page'))
+    return render(request, 'uploads_images.html', context={'images': images})
 
 
 # MARK: - Session
@@ -159,13 +306,30 @@ def session_visits_count(request):
 
 def detail_setup(obj):
     # MARK: - update()
-    obj.increase_view()
+    # 阅读量改由 post_view_beacon 累加，使详情页可以被浏览器缓存（304）
+    # obj.increase_view()
     # 刷新数据
-    obj.refresh_from_db()
+    # 阅读量改为缓冲计数后，模板直接读取 total_views，无需再查询一次
+    # obj.refresh_from_db()
     return obj, obj.owner.get_owner()
 
 
-def get_name():
-    name1 = Person.objects.all().first().full_name
-    name2 = Person.objects.all().first().full_name_with_midname('Wen')
+def load_home(request):
+    return get_post_page(request), get_name(request)
+
+
+def get_post_page(request):
+    # 首页文章列表游标分页，每页查询数量与耗时固定
+    paginator = CursorPaginator(Post.objects.for_listing(), settings.POSTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def get_name(request=None):
+    # name1 = Person.objects.all().first().full_name
+    # name2 = Person.objects.all().first().full_name_with_midname('Wen')
+    person = featured_person.get(request)
+    if person is None:
+        return '', ''
+    name1 = person.full_name
+    name2 = person.full_name_with_midname('Wen')
     return name1, name2
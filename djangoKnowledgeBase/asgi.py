@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoKnowledgeBase.settings')
 
 application = get_asgi_application()
+
+# 在第一个请求之前加载并编译模板
+from demo.template_bundle import warm_templates  # noqa: E402
+
+warm_templates()
@@ -0,0 +1,76 @@
+"""
+基准测试命令（python manage.py bench_*）共用的工具。
+
+基准测试在测试数据库中运行（与 manage.py test 相同的建库流程），
+不会读写 db.sqlite3。
+"""
+import statistics
+import threading
+from contextlib import contextmanager
+from time import perf_counter_ns
+
+from django.conf import settings
+from django.test.utils import get_runner
+
+
+@contextmanager
+def scratch_databases():
+    """创建测试数据库并在结束后删除；期间关闭 DEBUG，避免记录每条 SQL 影响结果"""
+    runner = get_runner(settings)(verbosity=0, interactive=False)
+    old_config = runner.setup_databases()
+    debug = settings.DEBUG
+    settings.DEBUG = False
+    try:
+        yield
+    finally:
+        settings.DEBUG = debug
+        runner.teardown_databases(old_config)
+
+
+def timed(func, number=1, repeat=5):
+    """
+    执行 repeat 轮、每轮 number 次，返回每次调用耗时的中位数（毫秒）。
+    """
+    rounds = []
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        for _ in range(number):
+            func()
+        rounds.append((perf_counter_ns() - start) / number / 1e6)
+    return statistics.median(rounds)
+
+
+def throughput(func, threads=1, duration=2.0):
+    """
+    threads 个线程在 duration 秒内反复调用 func(thread_index)，返回每秒完成的调用次数。
+    """
+    from django.db import connections
+
+    counts = [0] * threads
+    deadline = [None]
+    barrier = threading.Barrier(threads + 1)
+
+    def work(index):
+        try:
+            barrier.wait()
+            while perf_counter_ns() < deadline[0]:
+                func(index)
+                counts[index] += 1
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    start = perf_counter_ns()
+    deadline[0] = start + int(duration * 1e9)
+    barrier.wait()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / ((perf_counter_ns() - start) / 1e9)
+
+
+def write_table(stdout, headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in (headers, *rows):
+        stdout.write('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
@@ -0,0 +1,81 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from djangoKnowledgeBase.benchmark import scratch_databases, throughput, write_table
+
+# (journal_mode, synchronous)；DELETE + FULL 是 SQLite 的默认设置
+MODES = (
+    ('DELETE', 'FULL'),
+    ('TRUNCATE', 'FULL'),
+    ('WAL', 'FULL'),
+    ('WAL', 'NORMAL'),
+)
+
+
+class Command(BaseCommand):
+    help = '对比不同日志模式下读写混合负载的吞吐量'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000, help='文章数量')
+        parser.add_argument('--duration', type=float, default=5.0, help='每项测试的秒数')
+        parser.add_argument(
+            '--mix', nargs='+', default=['1:3', '2:6'],
+            help='写线程数:读线程数，可指定多组',
+        )
+
+    def handle(self, *args, **options):
+        with scratch_databases():
+            self.run(options)
+
+    def run(self, options):
+        from django.db import connection, connections
+        from demo.models import Group, Owner, Post
+        from demo.search import uninstall
+
+        # 全文索引的触发器与日志模式无关，只会拖慢造数据
+        uninstall(connection)
+        owner = Owner.objects.create(group=Group.objects.create(username='bench'))
+        Post.objects.bulk_create(
+            [Post(owner=owner, title='post {}'.format(i), body='body') for i in range(options['posts'])],
+            batch_size=1000,
+        )
+        pks = list(Post.objects.values_list('pk', flat=True))
+        # 各线程的连接按同一份 settings_dict 创建，修改后新连接即使用新的 PRAGMA
+        database_options = connection.settings_dict['OPTIONS']
+        original_pragmas = database_options.get('pragmas', {})
+
+        rows = []
+        for mix in options['mix']:
+            writers, readers = (int(n) for n in mix.split(':'))
+            for journal_mode, synchronous in MODES:
+                database_options['pragmas'] = {'journal_mode': journal_mode, 'synchronous': synchronous}
+                # 切换日志模式需要没有其他连接
+                connections.close_all()
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    if cursor.fetchone()[0].upper() != journal_mode:
+                        raise CommandError('无法切换到 {} 模式'.format(journal_mode))
+
+                counts = [0] * (writers + readers)
+
+                def work(index):
+                    pk = random.choice(pks)
+                    if index < writers:
+                        Post.objects.filter(pk=pk).update(views=F('views') + 1)
+                    else:
+                        Post.objects.filter(pk=pk).values_list('title', 'views').first()
+                    counts[index] += 1
+
+                total_rate = throughput(work, writers + readers, options['duration'])
+                elapsed = sum(counts) / total_rate
+                rows.append((
+                    mix, journal_mode, synchronous,
+                    '{:,.0f}'.format(sum(counts[writers:]) / elapsed),
+                    '{:,.0f}'.format(sum(counts[:writers]) / elapsed),
+                ))
+
+        database_options['pragmas'] = original_pragmas
+        connections.close_all()
+        write_table(self.stdout, ('writers:readers', 'journal', 'synchronous', 'reads/s', 'writes/s'), rows)
@@ -0,0 +1,39 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = '用 SQLite 在线备份接口把主库复制到从库'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default='default', help='主库别名')
+        parser.add_argument('--target', default='replica', help='从库别名')
+        parser.add_argument('--pages', type=int, default=1024, help='每步复制的页数，-1 表示一次复制全部')
+        parser.add_argument('--interval', type=float, default=None, help='持续同步的间隔（秒），默认只同步一次')
+
+    def handle(self, *args, **options):
+        source = connections[options['source']]
+        target_name = connections[options['target']].settings_dict['NAME']
+        if source.vendor != 'sqlite':
+            raise CommandError('只支持 SQLite 数据库')
+
+        while True:
+            start = time.perf_counter()
+            source.ensure_connection()
+            # 直接写入从库文件（而不是替换文件），已打开的从库连接可以看到新数据
+            target = sqlite3.connect(target_name)
+            try:
+                source.connection.backup(target, pages=options['pages'])
+            finally:
+                target.close()
+            # 长期运行时不要一直占用主库连接
+            source.close()
+
+            self.stdout.write('已同步到 {}，耗时 {:.1f} ms'.format(
+                target_name, (time.perf_counter() - start) * 1000))
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,89 @@
+# MARK: - 主从路由
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# 当前请求的路由状态：{'primary': 是否强制走主库, 'wrote': 是否发生过写入}
+# 使用可变字典，使 sync_to_async 线程中的修改对请求可见
+replica_state = ContextVar('replica_state', default=None)
+
+
+@contextmanager
+def force_primary():
+    """
+    在代码块内所有读操作都走主库，也可用作装饰器：
+
+        @force_primary()
+        def rebuild(): ...
+    """
+    state = replica_state.get()
+    if state is None:
+        token = replica_state.set({'primary': True, 'wrote': False})
+        try:
+            yield
+        finally:
+            replica_state.reset(token)
+    else:
+        previous = state['primary']
+        state['primary'] = True
+        try:
+            yield
+        finally:
+            state['primary'] = previous
+
+
+def replica_available(alias):
+    """从库文件存在时才可用，测试环境中从库是主库的镜像"""
+    name = connections[alias].settings_dict['NAME']
+    return name.startswith('file:') or name == ':memory:' or os.path.exists(name)
+
+
+class PrimaryReplicaRouter:
+    """
+    REPLICA_APPS 中模型的读操作走从库，其余操作走主库。
+
+    - 只有 ReplicaStickiness 中间件标记过的请求才读从库；管理命令、shell、
+      信号处理函数与后台线程等请求之外的代码都走主库
+    - 同一请求内发生写入后，后续读取都走主库（读己之写）
+    - 事务中的读取走主库，避免读到事务外的旧数据
+    - force_primary() 可强制走主库
+    - 从库文件不存在时回退到主库
+
+    从库由 sync_replica 命令从主库复制。
+    """
+    primary = 'default'
+    replica = 'replica'
+
+    def __init__(self):
+        self.apps = set(getattr(settings, 'REPLICA_APPS', ()))
+        self.user_model = settings.AUTH_USER_MODEL.lower()
+
+    def use_primary(self):
+        state = replica_state.get()
+        # 请求之外（state 为 None）从库可能落后于主库，一律读主库
+        if state is None or state['primary'] or state['wrote']:
+            return True
+        return connections[self.primary].in_atomic_block
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.apps or model._meta.label_lower == self.user_model:
+            return self.primary
+        if self.use_primary() or not replica_available(self.replica):
+            return self.primary
+        return self.replica
+
+    def db_for_write(self, model, **hints):
+        state = replica_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        dbs = {self.primary, self.replica}
+        return obj1._state.db in dbs and obj2._state.db in dbs
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == self.primary
@@ -40,6 +40,8 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    # 项目级的管理命令（sync_replica 等）
+    'djangoKnowledgeBase',
     'demo',
     'mig',
     'transanction_demo',
@@ -63,16 +65,28 @@ MIDDLEWARE = [
 
     # 'middleware.middlewares.NormalUserBlock',
     # 'middleware.middlewares.DebugOnlySuperUser',
+    'middleware.middlewares.ReplicaStickiness',
     'middleware.middlewares.ResponseTimer',
 ]
 
 ROOT_URLCONF = 'djangoKnowledgeBase.urls'
 
+# 生产环境使用缓存加载器：每个模板只读取、解析一次，之后常驻内存
+# 开发环境不缓存，修改模板后立即生效
+TEMPLATE_CACHED_LOADER = not DEBUG
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # 'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # 同 DjangoTemplates，另外为 ResponseTimer 记录模板渲染耗时
+        'BACKEND': 'middleware.profiling.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        # 'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -80,23 +94,70 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ] if TEMPLATE_CACHED_LOADER else TEMPLATE_LOADERS,
         },
     },
 ]
 
+# python manage.py precompile_templates 生成的模板清单，worker 启动时据此预热缓存加载器
+TEMPLATE_BUNDLE = os.path.join(BASE_DIR, 'template_bundle.json')
+
 WSGI_APPLICATION = 'djangoKnowledgeBase.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# 生产环境开启 WAL，读写互不阻塞。
+# WAL 模式会写入数据库文件头，开发环境不开启，避免改动仓库中的 db.sqlite3
+SQLITE_WAL = not DEBUG
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # 'ENGINE': 'django.db.backends.sqlite3',
+        # PRAGMA 调优的 SQLite 后端
+        'ENGINE': 'djangoKnowledgeBase.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {
+            'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'} if SQLITE_WAL else {},
+        },
         # 'ATOMIC_REQUESTS': True,
-    }
+        # 连接保持 60 秒，不必每个请求都重新打开数据库
+        'CONN_MAX_AGE': 60,
+        # 测试使用文件数据库（而不是内存数据库），多线程测试才能反映真实的锁竞争
+        'TEST': {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')},
+    },
+    # 从库：由 python manage.py sync_replica 从主库复制
+    'replica': {
+        'ENGINE': 'djangoKnowledgeBase.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {'read_only': True},
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# 进程内缓存，超过 MAX_ENTRIES 时按最近最少使用淘汰 1/CULL_FREQUENCY 的条目
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'knowledge-base',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['djangoKnowledgeBase.routers.PrimaryReplicaRouter']
+
+# 读操作走从库的 app（用户模型除外）
+REPLICA_APPS = ('demo', 'aggregation', 'mig')
+
+# 写入后的若干秒内，同一客户端的读操作都走主库（从库可能尚未同步）
+REPLICA_STICKY_SECONDS = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -139,3 +200,37 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
 AUTH_USER_MODEL = 'demo.MyUser'
+
+# 阅读量缓冲计数：每隔多少秒、或累计多少次访问后批量写回数据库
+VIEW_COUNTER_FLUSH_INTERVAL = 5
+VIEW_COUNTER_FLUSH_SIZE = 500
+
+# 首页文章列表每页数量
+POSTS_PER_PAGE = 10
+
+# 首页展示的 Person 进程内缓存时间（秒）
+FEATURED_PERSON_CACHE_TTL = 300
+
+# 图片列表每页数量
+IMAGES_PER_PAGE = 20
+
+# 缩略图任务的租期（秒）：处理中的图片超过租期未完成，视为 worker 已退出，重新领取
+IMAGE_CLAIM_LEASE = 600
+
+# 计数器类的 Session 改动先缓存在内存中，每隔多少秒批量写回数据库
+SESSION_ENGINE = 'demo.session_backend'
+SESSION_FLUSH_INTERVAL = 5
+# 只有这些计数器类的 key 变化时才延迟写入，其他改动（登录信息等）立即写入数据库
+SESSION_BUFFERED_KEYS = ['visits_count', 'deeper_count']
+
+# 延迟信号（send_deferred）的后台队列长度与工作线程数
+SIGNAL_QUEUE_SIZE = 1000
+SIGNAL_WORKERS = 2
+# 队列已满时：'block' 等待、'drop' 丢弃、'caller' 在调用方线程中执行
+SIGNAL_BACKPRESSURE = 'caller'
+# 信号接收函数耗时的抽样间隔：每多少次 send 记录一次
+SIGNAL_LATENCY_SAMPLE_EVERY = 10
+
+# 匿名用户整页缓存与模板片段缓存的过期时间（秒），数据变化时按版本号提前失效
+PAGE_CACHE_TIMEOUT = 60
+FRAGMENT_CACHE_TIMEOUT = 600
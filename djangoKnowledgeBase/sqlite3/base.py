@@ -0,0 +1,105 @@
+"""
+针对生产环境调优的 SQLite 数据库后端。
+
+在 settings.DATABASES 中使用：
+
+    'ENGINE': 'djangoKnowledgeBase.sqlite3',
+    'OPTIONS': {
+        # 覆盖或补充默认的 PRAGMA，例如开启 WAL：读写互不阻塞，
+        # 但会持久写入数据库文件头
+        'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+        # 所有事务都以 BEGIN IMMEDIATE 开始
+        'transaction_mode': 'IMMEDIATE',
+        # 以只读方式打开数据库
+        'read_only': True,
+    },
+
+demo.uuids.BinaryUUIDField 在本后端上以 16 字节 BLOB 保存 UUID。
+"""
+import uuid
+from contextlib import contextmanager
+
+from django.db.backends.sqlite3 import base, features, operations
+
+
+class DatabaseFeatures(features.DatabaseFeatures):
+    # BinaryUUIDField 以 16 字节保存，而不是 char(32) 的十六进制文本
+    has_binary_uuid_field = True
+
+
+class DatabaseOperations(operations.DatabaseOperations):
+    def convert_uuidfield_value(self, value, expression, connection):
+        if isinstance(value, bytes):
+            return uuid.UUID(bytes=value)
+        return super().convert_uuidfield_value(value, expression, connection)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    features_class = DatabaseFeatures
+    ops_class = DatabaseOperations
+
+    # 每个新连接都会执行的 PRAGMA；都只作用于连接，不改动数据库文件本身
+    DEFAULT_PRAGMAS = {
+        'mmap_size': 256 * 1024 * 1024,
+        # 负数表示 KiB
+        'cache_size': -20000,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    }
+    # 以下选项由本后端处理，不传给 sqlite3.connect()
+    EXTRA_OPTIONS = ('pragmas', 'transaction_mode', 'read_only')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._transaction_mode = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for name in self.EXTRA_OPTIONS:
+            kwargs.pop(name, None)
+
+        database = kwargs['database']
+        if self.read_only and not database.startswith('file:') and database != ':memory:':
+            kwargs['database'] = 'file:{}?mode=ro'.format(database)
+        return kwargs
+
+    @property
+    def read_only(self):
+        return self.settings_dict['OPTIONS'].get('read_only', False)
+
+    @property
+    def pragmas(self):
+        pragmas = dict(self.DEFAULT_PRAGMAS, **self.settings_dict['OPTIONS'].get('pragmas', {}))
+        if self.read_only:
+            # 只读连接无法切换日志模式
+            pragmas.pop('journal_mode', None)
+            pragmas['query_only'] = 'ON'
+        return pragmas
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute('PRAGMA {} = {}'.format(name, value))
+        return conn
+
+    @contextmanager
+    def transaction_mode(self, mode):
+        """
+        代码块内开始的事务改用 BEGIN {mode}，覆盖 OPTIONS 中的 transaction_mode：
+
+            with connection.transaction_mode('IMMEDIATE'), transaction.atomic():
+                ...
+        """
+        previous = self._transaction_mode
+        self._transaction_mode = mode
+        try:
+            yield
+        finally:
+            self._transaction_mode = previous
+
+    def _start_transaction_under_autocommit(self):
+        mode = self._transaction_mode or self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode:
+            self.cursor().execute('BEGIN {}'.format(mode))
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,161 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from aggregation import reports
+from aggregation.models import Publisher
+from demo.featured import featured_person
+from demo.counters import ViewCounter
+from demo.models import Group, MyUser, Owner, Person, Post
+from middleware.middlewares import ReplicaStickiness
+
+from .routers import PrimaryReplicaRouter, force_primary, replica_available, replica_state
+
+
+# MARK: - 主从路由
+# 不使用 TestCase：TestCase 的每个测试都在事务中，事务中的读取一律走主库
+class RouterTestCase(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        cache.clear()
+        featured_person.invalidate()
+
+    def in_request(self, primary=False):
+        """模拟经过 ReplicaStickiness 的请求"""
+        token = replica_state.set({'primary': primary, 'wrote': False})
+        self.addCleanup(replica_state.reset, token)
+
+
+class RouterTests(RouterTestCase):
+    def test_outside_requests_read_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_marked_request_reads_replica(self):
+        self.in_request()
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        # 不在 REPLICA_APPS 中的模型、用户模型都走主库
+        self.assertEqual(self.router.db_for_read(MyUser), 'default')
+
+    def test_write_sticks_to_primary(self):
+        self.in_request()
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_transaction_and_force_primary(self):
+        self.in_request()
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        with force_primary():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_replica_available(self):
+        settings_dict = connections['replica'].settings_dict
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            with mock.patch.dict(settings_dict, NAME=path):
+                self.assertFalse(replica_available('replica'))
+                self.in_request()
+                # 从库文件不存在时回退到主库
+                self.assertEqual(self.router.db_for_read(Post), 'default')
+                open(path, 'w').close()
+                self.assertTrue(replica_available('replica'))
+                self.assertEqual(self.router.db_for_read(Post), 'replica')
+            with mock.patch.dict(settings_dict, NAME='file:replica?mode=memory'):
+                self.assertTrue(replica_available('replica'))
+
+
+class StickinessTests(RouterTestCase):
+    def setUp(self):
+        super().setUp()
+        self.reads = []
+
+    def view(self, write):
+        def view(request):
+            if write:
+                Publisher.objects.create(name='publisher')
+            self.reads.append(self.router.db_for_read(Post))
+            return HttpResponse()
+        return view
+
+    def request(self, write=False, cookies=None):
+        request = RequestFactory().post('/') if write else RequestFactory().get('/')
+        request.COOKIES.update(cookies or {})
+        return ReplicaStickiness(self.view(write))(request)
+
+    def test_write_sets_cookie_for_following_requests(self):
+        response = self.request(write=True)
+        cookie = response.cookies[ReplicaStickiness.cookie_name]
+        self.assertEqual(cookie['max-age'], 5)
+
+        self.request(cookies={ReplicaStickiness.cookie_name: cookie.value})
+        self.request()
+        # 写入后的读取、带 Cookie 的请求走主库；Cookie 过期后恢复读从库
+        self.assertEqual(self.reads, ['default', 'default', 'replica'])
+        self.assertIsNone(replica_state.get())
+
+    def test_read_only_request_sets_no_cookie(self):
+        response = self.request()
+        self.assertNotIn(ReplicaStickiness.cookie_name, response.cookies)
+
+
+# MARK: - SQLite 后端
+class TransactionModeTests(TransactionTestCase):
+    def begin_statements(self):
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            Publisher.objects.exists()
+        return [q['sql'] for q in queries if q['sql'].startswith('BEGIN')]
+
+    def test_transaction_mode_overrides_options(self):
+        self.assertEqual(self.begin_statements(), ['BEGIN'])
+        with connection.transaction_mode('IMMEDIATE'):
+            self.assertEqual(self.begin_statements(), ['BEGIN IMMEDIATE'])
+        self.assertEqual(self.begin_statements(), ['BEGIN'])
+
+
+# MARK: - 缓存填充读主库
+class CacheFillTests(RouterTestCase):
+    def assertNoReplicaQueries(self, func):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            result = func()
+        self.assertEqual(len(queries), 0, [q['sql'] for q in queries])
+        return result
+
+    def test_report_cache_fills_from_primary(self):
+        self.in_request()
+        self.assertNoReplicaQueries(lambda: reports.cached_report(
+            'publisher_price', (Publisher,), '', reports.publisher_price_distribution,
+        ))
+
+    def test_featured_person_fills_from_primary(self):
+        Person.objects.create(first_name='a', last_name='b')
+        self.in_request()
+        person = self.assertNoReplicaQueries(featured_person.get)
+        self.assertEqual(person.first_name, 'a')
+
+    def test_cached_page_fills_from_primary(self):
+        # 匿名用户的文章列表页经过整页缓存
+        self.assertNoReplicaQueries(lambda: self.client.get(reverse('demo:post_list_api')))
+
+    def test_view_beacon_reads_primary(self):
+        post = Post.objects.create(owner=Owner.objects.create(group=Group.objects.create(username='g')), title='t')
+        Post.objects.filter(pk=post.pk).update(views=10)
+        # 不自动写回的计数器，阅读量 = 数据库中的 10 + 缓冲区中的 1
+        with mock.patch('demo.views.view_counter', ViewCounter('demo.Post', 'views', flush_interval=None)):
+            response = self.assertNoReplicaQueries(
+                lambda: self.client.post(reverse('demo:view_beacon', args=[post.pk]))
+            )
+        self.assertEqual(response.json(), {'views': 11})
+
+    def test_view_beacon_missing_post(self):
+        response = self.client.post(reverse('demo:view_beacon', args=[0]))
+        self.assertEqual(response.status_code, 404)
@@ -19,7 +19,7 @@ from demo.views import HomePageView
 from django.conf import settings
 from django.conf.urls.static import static
 
-from middleware.views import mid_test
+from middleware.views import mid_test, profile_dump
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -29,8 +29,11 @@ urlpatterns = [
     path('transanction/', include('transanction_demo.urls', namespace='transanction')),
     # MAR: - 中间件 demo
     path('middleware/',mid_test),
+    path('middleware/profile/', profile_dump, name='profile_dump'),
     # 信号
     path('signal/', include('mySignal.urls', namespace='signal')),
+    # 聚合报表
+    path('aggregation/', include('aggregation.urls', namespace='aggregation')),
 ]
 # urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.cache import cache
+
+
+# MARK: - 表版本号
+# 表中数据每次变化版本号加一，缓存的 key 中带上相关表的版本号，
+# 数据变化后旧缓存自然失效，无需逐个删除
+def version_key(model):
+    return 'version:{}'.format(model._meta.db_table)
+
+
+def initial_version():
+    # 版本号可能被 LRU 淘汰，重新生成时不能与旧版本号重复，
+    # 因此以当前时间（微秒）作为初始值而不是 1
+    return time.time_ns() // 1000
+
+
+def table_version(model):
+    return cache.get_or_set(version_key(model), initial_version, None)
+
+
+def table_versions(models):
+    """多张表的版本号拼成一个字符串，一次 get_many 取回"""
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = cache.get_or_set(key, initial_version, None)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_version(model):
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        cache.set(version_key(model), initial_version(), None)
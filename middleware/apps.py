@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MiddlewareConfig(AppConfig):
     name = 'middleware'
+
+    def ready(self):
+        # 注册 connection_created 信号，为数据库连接挂上 SQL 计时
+        import middleware.profiling
@@ -1,33 +1,149 @@
-# Django 1.11 以前的中间件 Mixin
-# 以后可能会废弃
-from django.utils.deprecation import MiddlewareMixin
-
 from django.http import HttpResponseForbidden
-import sys
 from django.views.debug import technical_500_response
-from datetime import datetime
+import asyncio
+from datetime import timedelta
+from time import perf_counter_ns
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+
+from demo.featured import featured_person
+from djangoKnowledgeBase.routers import replica_state
+from .profiling import current_timing, latency_store
+
+
+class AsyncCapableMiddleware:
+    """
+    同时支持 WSGI 与 ASGI 的中间件基类。
+
+    get_response 为协程函数时（ASGI 且后续中间件均支持异步），
+    本中间件也以协程方式运行，并把钩子方法换成 async 版本，
+    避免 Django 为每个钩子都包一层 sync_to_async 线程切换。
+    """
+    sync_capable = True
+    async_capable = True
 
+    # 异步模式下替换的钩子方法：{同步方法名: 异步方法名}
+    async_hooks = {}
 
-class ResponseTimer:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # 让 Django 把本中间件实例当作协程函数
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            for hook, async_hook in self.async_hooks.items():
+                setattr(self, hook, getattr(self, async_hook))
 
     def __call__(self, request):
-        request._request_time = datetime.now()
-        response = self.get_response(request)
+        if self.is_async:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+class ResponseTimer(AsyncCapableMiddleware):
+    """
+    记录请求各阶段耗时：中间件 / 视图 / 模板渲染 / 数据库。
+
+    使用单调时钟 perf_counter_ns()，结果写入 Server-Timing 响应头，
+    并按 url name 汇总到 latency_store 中。
+    应放在 MIDDLEWARE 的最后一项，使视图阶段只包含视图本身。
+    """
+    async_hooks = {
+        'process_view': 'aprocess_view',
+        'process_template_response': 'aprocess_template_response',
+    }
+
+    def start(self, request):
+        request._timing = timing = {
+            'view_start': None, 'view_end': None,
+            'template': 0, 'template_in_view': 0, 'db': 0, 'queries': 0,
+        }
+        return perf_counter_ns(), current_timing.set(timing)
+
+    def handle(self, request):
+        start, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, start)
+
+    async def __acall__(self, request):
+        start, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, start)
+
+    def finish(self, request, response, start):
+        timing = request._timing
+        end = perf_counter_ns()
+        total = end - start
+        if timing['view_start'] is not None:
+            # 视图中 render() 的耗时记入模板阶段
+            view = max((timing['view_end'] or end) - timing['view_start'] - timing['template_in_view'], 0)
+        else:
+            view = 0
+        phases = {
+            'total': total,
+            'mw': max(total - view - timing['template'], 0),
+            'view': view,
+            'tpl': timing['template'],
+            'db': timing['db'],
+        }
+
+        response['Server-Timing'] = ', '.join(
+            '{};dur={:.3f}'.format(phase, ns / 1e6) for phase, ns in phases.items()
+        ) + ', queries;desc="{} queries"'.format(timing['queries'])
+
+        match = request.resolver_match
+        latency_store.record(match.view_name if match else '<unresolved>', phases)
+
+        # 首页 Person 缓存是否命中
+        state = getattr(request, '_featured_person_cache', None)
+        if state is not None:
+            response['X-Featured-Person-Cache'] = state
         return response
 
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing['view_start'] = perf_counter_ns()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request._timing['view_start'] = perf_counter_ns()
+
     def process_template_response(self, request, response):
-        response_time = request._request_time - datetime.now()
-        response.context_data['response_time'] = abs(response_time)
+        return self.timed_template_response(request, response)
+
+    async def aprocess_template_response(self, request, response):
+        return self.timed_template_response(request, response)
+
+    def timed_template_response(self, request, response):
+        timing = request._timing
+        # 模板耗时由 TimedDjangoTemplates 记录
+        timing['view_end'] = now = perf_counter_ns()
+
+        if response.context_data is None:
+            response.context_data = {}
+        response.context_data['response_time'] = timedelta(microseconds=(now - (timing['view_start'] or now)) / 1000)
+        response.context_data['featured_person_cache'] = featured_person.stats()
         return response
 
 
-class NormalUserBlock:
-    def __init__(self, get_response):
-        self.get_response = get_response
+def is_superuser(request):
+    return request.user.is_superuser
 
-    def __call__(self, request):
+
+class NormalUserBlock(AsyncCapableMiddleware):
+    def handle(self, request):
         if (request.user.is_superuser != True) and (request.path == '/middleware/'):
             return HttpResponseForbidden('<h3>超级用户方可访问此页面！</h3>')
 
@@ -35,19 +151,60 @@ class NormalUserBlock:
 
         return response
 
+    async def __acall__(self, request):
+        # 只有访问受限路径时才读取用户（需查询数据库）
+        if request.path == '/middleware/' and not await sync_to_async(is_superuser)(request):
+            return HttpResponseForbidden('<h3>超级用户方可访问此页面！</h3>')
 
-class DebugOnlySuperUser:
-
-    def __init__(self, get_response):
-        self.get_response = get_response
+        return await self.get_response(request)
 
-    def __call__(self, request):
-        response = self.get_response(request)
-        return response
 
+class DebugOnlySuperUser(AsyncCapableMiddleware):
+    # Django 总是以同步方式调用 process_exception，ASGI 下会在子线程中执行，
+    # 此时 sys.exc_info() 为空，因此直接使用异常对象
     def process_exception(self, request, exception):
         if request.user.is_superuser:
-            return technical_500_response(request, *sys.exc_info())
+            # return technical_500_response(request, *sys.exc_info())
+            return technical_500_response(request, type(exception), exception, exception.__traceback__)
+
+
+class ReplicaStickiness(AsyncCapableMiddleware):
+    """
+    配合 PrimaryReplicaRouter 实现读己之写。
+
+    请求内发生写入后，后续读取走主库；并通过 Cookie 让该客户端
+    在 REPLICA_STICKY_SECONDS 秒内的请求都走主库（如 POST 后重定向的 GET）。
+    """
+    cookie_name = 'use_primary'
+
+    def start(self, request):
+        state = {'primary': self.cookie_name in request.COOKIES, 'wrote': False}
+        return state, replica_state.set(state)
+
+    def handle(self, request):
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_state.reset(token)
+        return self.finish(state, response)
+
+    def finish(self, state, response):
+        if state['wrote']:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
 
 
 class Md1:
@@ -0,0 +1,161 @@
+import math
+import threading
+from contextvars import ContextVar
+from time import perf_counter_ns
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+# MARK: - 查询计时
+# 当前请求的计时数据；sync_to_async 会把 contextvars 带入线程，
+# 因此同步、异步视图里的查询都能记到对应的请求上
+current_timing = ContextVar('current_timing', default=None)
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    统计当前请求的 SQL 数量与耗时，不在请求中执行的查询直接放行。
+    """
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing['db'] += perf_counter_ns() - start
+        timing['queries'] += 1
+
+
+@receiver(connection_created, dispatch_uid="install_query_timer")
+def install_query_timer(sender, connection, **kwargs):
+    # 每个新建的数据库连接都挂上 query_timer
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+# MARK: - 模板渲染计时
+class TimedTemplate(Template):
+    """把渲染耗时记到当前请求上；{% include %} 等嵌套模板由引擎直接渲染，不会重复计时"""
+
+    def render(self, context=None, request=None):
+        timing = current_timing.get()
+        if timing is None:
+            return super().render(context, request)
+
+        start = perf_counter_ns()
+        try:
+            return super().render(context, request)
+        finally:
+            elapsed = perf_counter_ns() - start
+            timing['template'] += elapsed
+            # render() 在视图内渲染；TemplateResponse 在视图返回之后才渲染
+            if timing['view_end'] is None:
+                timing['template_in_view'] += elapsed
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    记录模板渲染耗时的 Django 模板后端，在 TEMPLATES 的 BACKEND 中使用。
+    render() 与 TemplateResponse 都经过这里，因此所有视图都能统计到模板阶段。
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# MARK: - 延迟直方图
+# 每 2 倍分为 4 个桶，1μs ~ 100s 大约 100 个桶
+BUCKETS_PER_DOUBLING = 4
+
+
+def bucket_of(ns):
+    us = max(ns, 1000) / 1000
+    return int(math.log2(us) * BUCKETS_PER_DOUBLING)
+
+
+def bucket_upper_ns(bucket):
+    return int(2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING) * 1000)
+
+
+class LatencyStore:
+    """
+    按 url name 与阶段聚合的延迟直方图。
+
+    每个线程只写自己的那份数据，写入时不加锁；
+    snapshot() 读取时再把所有线程的数据合并。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._stores = []
+
+    def _store(self):
+        store = getattr(self._local, 'store', None)
+        if store is None:
+            store = self._local.store = {}
+            # list.append 在 GIL 下是原子操作
+            self._stores.append(store)
+        return store
+
+    def record(self, name, phases):
+        store = self._store()
+        histograms = store.get(name)
+        if histograms is None:
+            histograms = store[name] = {}
+        for phase, ns in phases.items():
+            counts = histograms.get(phase)
+            if counts is None:
+                counts = histograms[phase] = {}
+            bucket = bucket_of(ns)
+            counts[bucket] = counts.get(bucket, 0) + 1
+
+    def merged(self):
+        merged = {}
+        for store in list(self._stores):
+            for name, histograms in store.copy().items():
+                target = merged.setdefault(name, {})
+                for phase, counts in histograms.copy().items():
+                    bucket_counts = target.setdefault(phase, {})
+                    for bucket, count in counts.copy().items():
+                        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + count
+        return merged
+
+    def snapshot(self):
+        result = {}
+        for name, histograms in self.merged().items():
+            result[name] = {
+                phase: summarize(counts) for phase, counts in histograms.items()
+            }
+        return result
+
+    def reset(self):
+        for store in list(self._stores):
+            store.clear()
+
+
+def summarize(counts):
+    total = sum(counts.values())
+    summary = {'count': total}
+    for label, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+        seen = 0
+        for bucket in sorted(counts):
+            seen += counts[bucket]
+            if seen >= total * q:
+                # 以桶的上界近似，单位毫秒
+                summary[label] = round(bucket_upper_ns(bucket) / 1e6, 3)
+                break
+    return summary
+
+
+latency_store = LatencyStore()
@@ -1,7 +1,14 @@
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.template.response import TemplateResponse
 
+from demo.caching import fragment_stats, page_stats
+from demo.featured import featured_person
+from mySignal.dispatch import dispatcher
+from mySignal.signals import view_done
+from transanction_demo.runner import metrics as transaction_metrics
+from .profiling import latency_store
+
 # Create your views here.
 
 def mid_test(request):
@@ -10,3 +17,20 @@ def mid_test(request):
     # return HttpResponse('中间件测试..')
     return TemplateResponse(request, 'midware_demo.html', context={})
 
+
+# 查看各 url 的延迟分布，仅超级用户可访问
+def profile_dump(request):
+    if not request.user.is_superuser:
+        return HttpResponseForbidden('<h3>超级用户方可访问此页面！</h3>')
+
+    return JsonResponse({
+        'latency_ms': latency_store.snapshot(),
+        'caches': {
+            'featured_person': featured_person.stats(),
+            'pages': page_stats.snapshot(),
+            'fragments': fragment_stats.snapshot(),
+        },
+        'transactions': transaction_metrics.snapshot(),
+        'signals': dispatcher.stats.snapshot(),
+        'signal_latency_ms': {'view_done': view_done.latency.snapshot()},
+    })
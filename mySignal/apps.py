@@ -1,3 +1,5 @@
+import atexit
+
 from django.apps import AppConfig
 
 
@@ -5,4 +7,7 @@ class MysignalConfig(AppConfig):
     name = 'mySignal'
 
     def ready(self):
-        import mySignal.handlers
\ No newline at end of file
+        import mySignal.handlers
+        from .dispatch import dispatcher
+        # 进程退出前执行完队列中的信号
+        atexit.register(dispatcher.shutdown)
@@ -0,0 +1,288 @@
+import itertools
+import logging
+import queue
+import threading
+import weakref
+from time import perf_counter_ns
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from django.dispatch.dispatcher import NONE_ID, _make_id
+
+from middleware.profiling import LatencyStore
+
+logger = logging.getLogger(__name__)
+
+# 队列已满时的处理方式
+BLOCK = 'block'      # 等待队列空出位置，超时后丢弃
+DROP = 'drop'        # 直接丢弃，只计数
+CALLER = 'caller'    # 在调用方线程中同步执行
+
+
+def receiver_name(receiver):
+    return '{}.{}'.format(receiver.__module__, getattr(receiver, '__qualname__', repr(receiver)))
+
+
+# MARK: - 统计
+class ReceiverStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._receivers = {}
+        self._queue = {'queued': 0, 'dropped': 0, 'ran_in_caller': 0}
+
+    def record(self, name, ns, failed):
+        with self._lock:
+            stats = self._receivers.setdefault(name, {'calls': 0, 'failures': 0, 'total_ns': 0, 'max_ns': 0})
+            stats['calls'] += 1
+            stats['failures'] += failed
+            stats['total_ns'] += ns
+            stats['max_ns'] = max(stats['max_ns'], ns)
+
+    def incr(self, key):
+        with self._lock:
+            self._queue[key] += 1
+
+    def snapshot(self):
+        with self._lock:
+            receivers = {
+                name: {
+                    'calls': s['calls'],
+                    'failures': s['failures'],
+                    'avg_ms': round(s['total_ns'] / s['calls'] / 1e6, 3),
+                    'max_ms': round(s['max_ns'] / 1e6, 3),
+                }
+                for name, s in self._receivers.items()
+            }
+            return {'receivers': receivers, **self._queue}
+
+
+# MARK: - 后台分发
+class SignalDispatcher:
+    """
+    有界队列 + 工作线程池，在请求之外执行信号的接收函数。
+
+    单个接收函数出错不影响其他接收函数（与 send_robust 相同），
+    错误记入统计并写日志。
+    """
+
+    def __init__(self, maxsize=1000, workers=2, policy=CALLER, put_timeout=1.0):
+        self.queue = queue.Queue(maxsize)
+        self.workers = workers
+        self.policy = policy
+        self.put_timeout = put_timeout
+        self.stats = ReceiverStats()
+
+        self._threads = []
+        self._threads_lock = threading.Lock()
+
+    def submit(self, signal, sender, events):
+        self._ensure_workers()
+        task = (signal, sender, events)
+        try:
+            if self.policy == BLOCK:
+                self.queue.put(task, timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait(task)
+        except queue.Full:
+            if self.policy == CALLER:
+                self.stats.incr('ran_in_caller')
+                self.run(*task)
+            else:
+                self.stats.incr('dropped')
+            return
+        self.stats.incr('queued')
+
+    def run(self, signal, sender, events):
+        # 一批事件只查找一次接收函数
+        for receiver, name in signal._resolve(sender):
+            for named in events:
+                start = perf_counter_ns()
+                failed = False
+                try:
+                    signal.call(receiver, name, sender, named)
+                except Exception:
+                    failed = True
+                    logger.exception('Signal receiver %s failed', name)
+                self.stats.record(name, perf_counter_ns() - start, failed)
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        with self._threads_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name='signal-worker-{}'.format(i), daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            task = self.queue.get()
+            try:
+                if task is None:
+                    return
+                self.run(*task)
+                # 工作线程不经过请求流程，需自行关闭失效的数据库连接
+                close_old_connections()
+            finally:
+                self.queue.task_done()
+
+    def shutdown(self):
+        # 进程退出前执行完队列中剩余的任务
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+dispatcher = SignalDispatcher(
+    maxsize=getattr(settings, 'SIGNAL_QUEUE_SIZE', 1000),
+    workers=getattr(settings, 'SIGNAL_WORKERS', 2),
+    policy=getattr(settings, 'SIGNAL_BACKPRESSURE', CALLER),
+)
+
+
+# MARK: - 信号
+class FastSignal(Signal):
+    """
+    缓存接收函数查找结果的信号。
+
+    Django 的 Signal 每次 send() 都要加锁遍历全部接收函数并逐个比较 sender，
+    use_caching=True 又要求 sender 可以被弱引用（字符串等不行）。
+    这里按 sender 缓存匹配的接收函数，connect / disconnect
+    以及弱引用失效时整体丢弃缓存。
+
+    接收函数的耗时按 SIGNAL_LATENCY_SAMPLE_EVERY 抽样记入 latency 直方图。
+    """
+    # 缓存的 sender 数量上限，超过后清空
+    max_cached_senders = 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._receiver_cache = {}
+        self.latency = LatencyStore()
+        # 每 sample_every 次 send 记录一次各接收函数的耗时，降低直方图本身的开销；
+        # 后台队列中的调用总是记录
+        self.sample_every = getattr(settings, 'SIGNAL_LATENCY_SAMPLE_EVERY', 1)
+        self._calls = itertools.count()
+
+    def _invalidate(self):
+        # 替换而不是 clear()：正在计算的旧结果只会写入被丢弃的字典
+        self._receiver_cache = {}
+
+    def connect(self, *args, **kwargs):
+        super().connect(*args, **kwargs)
+        self._invalidate()
+
+    def disconnect(self, *args, **kwargs):
+        disconnected = super().disconnect(*args, **kwargs)
+        self._invalidate()
+        return disconnected
+
+    def _remove_receiver(self, receiver=None):
+        super()._remove_receiver(receiver)
+        self._invalidate()
+
+    def _resolve(self, sender):
+        """返回 [(receiver, 统计用名称), ...]"""
+        cache = self._receiver_cache
+        key = _make_id(sender)
+        entries = cache.get(key)
+        if entries is None:
+            # 只缓存匹配的（弱）引用，不延长接收函数的生命周期
+            with self.lock:
+                self._clear_dead_receivers()
+                refs = [
+                    receiver for (_, sender_key), receiver in self.receivers
+                    if sender_key == NONE_ID or sender_key == key
+                ]
+            entries = []
+            for ref in refs:
+                receiver = ref() if isinstance(ref, weakref.ReferenceType) else ref
+                if receiver is not None:
+                    entries.append((ref, receiver_name(receiver)))
+            if len(cache) >= self.max_cached_senders:
+                cache.clear()
+            cache[key] = entries
+
+        receivers = []
+        for ref, name in entries:
+            if isinstance(ref, weakref.ReferenceType):
+                ref = ref()
+                if ref is None:
+                    continue
+            receivers.append((ref, name))
+        return receivers
+
+    def _live_receivers(self, sender):
+        return [receiver for receiver, _ in self._resolve(sender)]
+
+    def sampled(self):
+        return next(self._calls) % self.sample_every == 0
+
+    def call(self, receiver, name, sender, named):
+        start = perf_counter_ns()
+        try:
+            return receiver(signal=self, sender=sender, **named)
+        finally:
+            self.latency.record(name, {'call': perf_counter_ns() - start})
+
+    def send(self, sender, **named):
+        if not self.receivers:
+            return []
+
+        receivers = self._resolve(sender)
+        if not self.sampled():
+            return [(receiver, receiver(signal=self, sender=sender, **named)) for receiver, _ in receivers]
+        return [(receiver, self.call(receiver, name, sender, named)) for receiver, name in receivers]
+
+    def send_batch(self, sender, events):
+        """
+        一次分发多个事件：接收函数只查找一次，对每个事件各调用一次。
+        返回 [(receiver, [response, ...]), ...]
+        """
+        if not self.receivers or not events:
+            return []
+
+        receivers = self._resolve(sender)
+        if not self.sampled():
+            return [
+                (receiver, [receiver(signal=self, sender=sender, **named) for named in events])
+                for receiver, _ in receivers
+            ]
+        return [
+            (receiver, [self.call(receiver, name, sender, named) for named in events])
+            for receiver, name in receivers
+        ]
+
+
+class DeferredSignal(FastSignal):
+    """
+    支持延迟分发的信号。
+
+    send_deferred() 在当前事务提交后才把信号放入后台队列，事务回滚则不发送；
+    不在事务中时立即入队。asend() 供异步视图使用。
+    原有的 send() / send_robust() 仍是同步执行。
+    """
+
+    def send_deferred(self, sender, using=None, **named):
+        self.send_deferred_batch(sender, [named], using=using)
+
+    def send_deferred_batch(self, sender, events, using=None):
+        # 多个事件只占用队列中的一个位置
+        if not self.receivers or not events:
+            return
+        transaction.on_commit(lambda: dispatcher.submit(self, sender, events), using=using)
+
+    async def asend(self, sender, **named):
+        # 异步视图中不存在 Django 事务，直接入队；
+        # 队列已满且需要等待时放到线程中，避免阻塞事件循环
+        if not self.receivers:
+            return
+        if dispatcher.policy == DROP or not dispatcher.queue.full():
+            dispatcher.submit(self, sender, [named])
+        else:
+            await sync_to_async(dispatcher.submit, thread_sensitive=False)(self, sender, [named])
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.dispatch import Signal
+
+from djangoKnowledgeBase.benchmark import timed, write_table
+from mySignal.dispatch import FastSignal
+
+
+def make_receiver():
+    def receiver(sender, **kwargs):
+        return None
+    return receiver
+
+
+class Command(BaseCommand):
+    help = (
+        '对比 Django 的 Signal 与 FastSignal：查找接收函数、send() 以及 send_batch() 的耗时（不访问数据库）。'
+        'FastSignal 按 SIGNAL_LATENCY_SAMPLE_EVERY 抽样记录耗时，unsampled 一列不记录'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receivers', type=int, nargs='+', default=[1, 10, 100], help='匹配的接收函数个数')
+        parser.add_argument('--number', type=int, default=20000, help='每轮调用次数')
+        parser.add_argument('--batch', type=int, default=10, help='send_batch() 一次分发的事件数')
+
+    def handle(self, *args, **options):
+        number = options['number']
+        events = [{'n': i} for i in range(options['batch'])]
+        rows = []
+        for count in options['receivers']:
+            # 同时连接 count 个其他 sender 的接收函数，查找时需要逐个跳过
+            receivers = [make_receiver() for _ in range(count * 2)]
+            stock, fast, unsampled = Signal(), FastSignal(), FastSignal()
+            # 不记录耗时直方图，单独衡量缓存查找的效果
+            unsampled.sample_every = number * 10
+            for signal in (stock, fast, unsampled):
+                for receiver in receivers[:count]:
+                    signal.connect(receiver, sender='post')
+                for receiver in receivers[count:]:
+                    signal.connect(receiver, sender='other')
+
+            def us(func, n=number):
+                return '{:.2f}'.format(timed(func, n) * 1000)
+
+            rows.append((
+                count,
+                us(lambda: stock._live_receivers('post')),
+                us(lambda: fast._live_receivers('post')),
+                us(lambda: stock.send('post', n=0)),
+                us(lambda: fast.send('post', n=0)),
+                us(lambda: unsampled.send('post', n=0)),
+                us(lambda: [fast.send('post', **named) for named in events], number // len(events)),
+                us(lambda: fast.send_batch('post', events), number // len(events)),
+            ))
+
+        batch = len(events)
+        write_table(self.stdout, (
+            'receivers', 'lookup Signal µs', 'lookup FastSignal µs', 'send Signal µs', 'send FastSignal µs',
+            'unsampled µs',
+            '{}x send µs'.format(batch), 'send_batch({}) µs'.format(batch),
+        ), rows)
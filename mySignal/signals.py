@@ -1,3 +1,3 @@
-import django.dispatch
+from mySignal.dispatch import DeferredSignal
 
-view_done = django.dispatch.Signal()
\ No newline at end of file
+view_done = DeferredSignal()
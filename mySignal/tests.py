@@ -1,3 +1,164 @@
-from django.test import TestCase
+import gc
+from unittest import mock
 
-# Create your tests here.
+from django.db import transaction
+from django.dispatch.dispatcher import _make_id
+from django.test import SimpleTestCase, TransactionTestCase
+
+from . import dispatch
+from .dispatch import BLOCK, CALLER, DROP, DeferredSignal, FastSignal, SignalDispatcher
+
+
+# MARK: - 延迟分发
+class DispatcherTestMixin:
+    def make_dispatcher(self, **kwargs):
+        """替换模块级的 dispatcher，send_deferred / asend 都会用到它"""
+        dispatcher = SignalDispatcher(**kwargs)
+        patcher = mock.patch.object(dispatch, 'dispatcher', dispatcher)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(dispatcher.shutdown)
+        return dispatcher
+
+    def make_signal(self, *receivers):
+        signal = DeferredSignal()
+        for receiver in receivers:
+            signal.connect(receiver, weak=False)
+        return signal
+
+
+# 不使用 TestCase：on_commit 回调要在真正提交时才执行
+class DeferredDispatchTests(DispatcherTestMixin, TransactionTestCase):
+    def setUp(self):
+        self.received = []
+        self.dispatcher = self.make_dispatcher(workers=1)
+        self.signal = self.make_signal(lambda sender, **named: self.received.append(named['n']))
+
+    def test_sent_after_commit(self):
+        with transaction.atomic():
+            self.signal.send_deferred(sender='test', n=1)
+            self.assertEqual(self.dispatcher.queue.qsize(), 0)
+        self.dispatcher.queue.join()
+        self.assertEqual(self.received, [1])
+        self.assertEqual(self.dispatcher.stats.snapshot()['queued'], 1)
+
+    def test_not_sent_on_rollback(self):
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                self.signal.send_deferred(sender='test', n=1)
+                1 / 0
+        self.dispatcher.queue.join()
+        self.assertEqual(self.received, [])
+        self.assertEqual(self.dispatcher.stats.snapshot()['queued'], 0)
+
+    def test_sent_immediately_outside_transaction(self):
+        self.signal.send_deferred_batch('test', [{'n': 1}, {'n': 2}])
+        self.dispatcher.queue.join()
+        self.assertEqual(self.received, [1, 2])
+        # 一批事件只占一个队列位置
+        self.assertEqual(self.dispatcher.stats.snapshot()['queued'], 1)
+
+
+class BackpressureTests(DispatcherTestMixin, SimpleTestCase):
+    def setUp(self):
+        self.received = []
+        self.signal = self.make_signal(lambda sender, **named: self.received.append(named['n']))
+
+    def fill(self, **kwargs):
+        # 不启动工作线程，第二个任务一定遇到满队列
+        dispatcher = self.make_dispatcher(maxsize=1, **kwargs)
+        with mock.patch.object(dispatcher, '_ensure_workers'):
+            dispatcher.submit(self.signal, 'test', [{'n': 1}])
+            dispatcher.submit(self.signal, 'test', [{'n': 2}])
+        return dispatcher.stats.snapshot()
+
+    def test_caller_runs_overflow_synchronously(self):
+        stats = self.fill(policy=CALLER)
+        self.assertEqual((stats['queued'], stats['ran_in_caller'], stats['dropped']), (1, 1, 0))
+        self.assertEqual(self.received, [2])
+
+    def test_drop_counts_overflow(self):
+        stats = self.fill(policy=DROP)
+        self.assertEqual((stats['queued'], stats['ran_in_caller'], stats['dropped']), (1, 0, 1))
+        self.assertEqual(self.received, [])
+
+    def test_block_drops_after_timeout(self):
+        stats = self.fill(policy=BLOCK, put_timeout=0.01)
+        self.assertEqual((stats['queued'], stats['ran_in_caller'], stats['dropped']), (1, 0, 1))
+        self.assertEqual(self.received, [])
+
+
+class ReceiverFailureTests(DispatcherTestMixin, SimpleTestCase):
+    def test_failure_is_counted_and_logged(self):
+        received = []
+
+        def broken(sender, **named):
+            raise ValueError('boom')
+
+        def working(sender, **named):
+            received.append(named['n'])
+
+        signal = self.make_signal(broken, working)
+        dispatcher = self.make_dispatcher()
+        with self.assertLogs('mySignal.dispatch', 'ERROR') as logs:
+            dispatcher.run(signal, 'test', [{'n': 1}, {'n': 2}])
+
+        # 出错的接收函数不影响其他接收函数
+        self.assertEqual(received, [1, 2])
+        receivers = dispatcher.stats.snapshot()['receivers']
+        self.assertEqual(receivers[dispatch.receiver_name(broken)]['calls'], 2)
+        self.assertEqual(receivers[dispatch.receiver_name(broken)]['failures'], 2)
+        self.assertEqual(receivers[dispatch.receiver_name(working)]['failures'], 0)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('ValueError: boom', logs.output[0])
+
+
+# MARK: - 接收函数缓存
+class ReceiverCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.signal = FastSignal()
+
+    def test_cached_per_sender(self):
+        def receiver(sender, **named):
+            pass
+
+        self.signal.connect(receiver, sender='post')
+        self.assertEqual(self.signal._live_receivers('post'), [receiver])
+        self.assertEqual(self.signal._live_receivers('other'), [])
+        self.assertEqual(set(self.signal._receiver_cache), {_make_id('post'), _make_id('other')})
+
+    def test_connect_clears_cache(self):
+        def first(sender, **named):
+            pass
+
+        def second(sender, **named):
+            pass
+
+        self.signal.connect(first)
+        self.assertEqual(self.signal._live_receivers('post'), [first])
+        self.signal.connect(second, sender='post')
+        self.assertEqual(self.signal._receiver_cache, {})
+        self.assertEqual(self.signal._live_receivers('post'), [first, second])
+
+    def test_disconnect_clears_cache(self):
+        def receiver(sender, **named):
+            pass
+
+        self.signal.connect(receiver)
+        self.assertEqual(self.signal._live_receivers('post'), [receiver])
+        self.signal.disconnect(receiver)
+        self.assertEqual(self.signal._receiver_cache, {})
+        self.assertEqual(self.signal._live_receivers('post'), [])
+        self.assertEqual(self.signal.send('post'), [])
+
+    def test_dead_weakref_clears_cache(self):
+        def receiver(sender, **named):
+            pass
+
+        self.signal.connect(receiver)
+        self.assertEqual(self.signal._live_receivers('post'), [receiver])
+        # 缓存只保存弱引用，不会让接收函数继续存活
+        del receiver
+        gc.collect()
+        self.assertEqual(self.signal._receiver_cache, {})
+        self.assertEqual(self.signal._live_receivers('post'), [])
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import some_view
+from .views import some_view, async_some_view
 
 app_name = 'mySignal'
 
 urlpatterns = [
     path('', some_view, name='some_view'),
+    path('async/', async_some_view, name='async_some_view'),
 ]
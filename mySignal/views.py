@@ -16,10 +16,28 @@ from mySignal.signals import view_done
 
 def some_view(request):
 
-    view_done.send(
+    # view_done.send(
+    #     sender='View function...',
+    #     arg_1='My signal...',
+    #     arg_2='received...'
+    # )
+
+    # 事务提交后在后台线程中执行接收函数，不阻塞响应
+    view_done.send_deferred(
         sender='View function...',
         arg_1='My signal...',
         arg_2='received...'
     )
 
     return HttpResponse('响应完毕..')
+
+
+async def async_some_view(request):
+
+    await view_done.asend(
+        sender='Async view function...',
+        arg_1='My signal...',
+        arg_2='received...'
+    )
+
+    return HttpResponse('响应完毕..')
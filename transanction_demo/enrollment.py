@@ -0,0 +1,168 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+
+from .models import Student, Info, Address
+
+CHUNK_SIZE = 1000
+# 错误报告最多保留的条数，避免整份数据都出错时响应过大
+MAX_REPORTED_ERRORS = 1000
+
+NAME_MAX_LENGTH = Student._meta.get_field('name').max_length
+HOME_MAX_LENGTH = Address._meta.get_field('home').max_length
+
+
+# MARK: - 解析
+def decode_lines(stream):
+    """
+    逐行解码为 UTF-8，产出 (行号, 文本)；无法解码的行文本为 None。
+    按 \n 切分不会切断 UTF-8 的多字节字符，因此可以逐行解码。
+    """
+    for line_num, line in enumerate(stream, 1):
+        try:
+            yield line_num, line.decode('utf-8')
+        except UnicodeDecodeError:
+            yield line_num, None
+
+
+def iter_rows(stream, content_type):
+    """
+    逐行读取 CSV（表头 name,age,home）或 JSON lines，产出 (行号, 数据, 错误)。
+    编码错误、格式错误只记在对应的行上，不影响其余行。
+    """
+    lines = decode_lines(stream)
+    if 'json' in content_type:
+        for line_num, line in lines:
+            if line is None:
+                yield line_num, None, ['不是有效的 UTF-8 编码']
+                continue
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_num, None, ['JSON 格式错误：{}'.format(e)]
+                continue
+            if not isinstance(row, dict):
+                yield line_num, None, ['每行应为一个 JSON 对象']
+                continue
+            yield line_num, row, None
+    else:
+        yield from iter_csv_rows(lines)
+
+
+def iter_csv_rows(lines):
+    # csv 模块只拿到能解码的行，这里自己记录原始行号
+    current = [0]
+    undecodable = []
+
+    def text_lines():
+        for line_num, line in lines:
+            if line is None:
+                undecodable.append(line_num)
+                continue
+            current[0] = line_num
+            yield line
+
+    reader = csv.DictReader(text_lines())
+    while True:
+        row, error = None, None
+        try:
+            row = next(reader)
+        except StopIteration:
+            pass
+        except csv.Error as e:
+            # 例如含有 NUL 字符；出错后 reader 从下一行继续解析
+            error = 'CSV 格式错误：{}'.format(e)
+
+        for line_num in undecodable:
+            yield line_num, None, ['不是有效的 UTF-8 编码']
+        undecodable.clear()
+
+        if error is not None:
+            yield current[0], None, [error]
+        elif row is None:
+            return
+        else:
+            yield current[0], row, None
+
+
+def clean_row(row):
+    """
+    校验一行数据，返回 (Student, Info, Address) 或错误列表。
+
+    逐行调用 full_clean() 在十万行的量级下开销太大，这里只做必要的检查。
+    """
+    errors = []
+    name = str(row.get('name') or '').strip()
+    home = str(row.get('home') or '').strip()
+
+    if not name:
+        errors.append('name: 不能为空')
+    elif len(name) > NAME_MAX_LENGTH:
+        errors.append('name: 最多 {} 个字符'.format(NAME_MAX_LENGTH))
+
+    try:
+        age = int(row.get('age'))
+    except (TypeError, ValueError):
+        errors.append('age: 应为整数')
+
+    if not home:
+        errors.append('home: 不能为空')
+    elif len(home) > HOME_MAX_LENGTH:
+        errors.append('home: 最多 {} 个字符'.format(HOME_MAX_LENGTH))
+
+    if errors:
+        return None, errors
+    return (Student(name=name), Info(age=age), Address(home=home)), None
+
+
+# MARK: - 批量写入
+def enroll(stream, content_type, chunk_size=CHUNK_SIZE):
+    """
+    分块校验并写入学生数据。
+
+    每块在一个保存点中用 bulk_create 写入三张表，
+    某一块写入失败只回滚该块，其余块照常提交。
+    """
+    report = {'created': 0, 'failed': 0, 'errors': []}
+
+    def add_error(line_num, messages):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_num, 'errors': messages})
+
+    rows = iter_rows(stream, content_type)
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            lines, students, infos, addresses = [], [], [], []
+            for line_num, row, errors in chunk:
+                if errors is None:
+                    objs, errors = clean_row(row)
+                if errors:
+                    add_error(line_num, errors)
+                    continue
+                lines.append(line_num)
+                students.append(objs[0])
+                infos.append(objs[1])
+                addresses.append(objs[2])
+
+            try:
+                # 保存点：出错时只回滚本块
+                with transaction.atomic():
+                    Student.objects.bulk_create(students)
+                    Info.objects.bulk_create(infos)
+                    Address.objects.bulk_create(addresses)
+            except DatabaseError as e:
+                for line_num in lines:
+                    add_error(line_num, ['写入失败：{}'.format(e)])
+                continue
+            report['created'] += len(students)
+
+    return report
@@ -0,0 +1,191 @@
+import functools
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from time import perf_counter_ns
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+# 可以通过重试解决的错误
+RETRYABLE_MESSAGES = (
+    'database is locked',
+    'database table is locked',
+    'deadlock',
+    'could not serialize',
+    'serialization failure',
+)
+
+
+def is_retryable(exc):
+    message = str(exc).lower()
+    return isinstance(exc, OperationalError) and any(m in message for m in RETRYABLE_MESSAGES)
+
+
+# MARK: - 统计
+class TransactionMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, **deltas):
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {'calls': 0, 'retries': 0, 'failures': 0, 'lock_wait_ms': 0.0, 'backoff_ms': 0.0},
+            )
+            for key, value in deltas.items():
+                stats[key] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+metrics = TransactionMetrics()
+
+
+# MARK: - BEGIN IMMEDIATE
+@contextmanager
+def begin_immediate(using, on_wait):
+    """
+    开始一个 BEGIN IMMEDIATE 事务，on_wait 收到等待写锁的时间（纳秒）。
+
+    SQLite 默认的 BEGIN 是延迟加锁的，两个事务都读过数据后再写就会互相等待而报错。
+    BEGIN IMMEDIATE 在事务开始时就取得写锁，等锁发生在事务开头，可以安全地重试。
+    由 djangoKnowledgeBase.sqlite3 后端的 transaction_mode() 执行；
+    其他后端、或已在事务中时（只创建保存点）等同于 transaction.atomic()。
+    """
+    connection = connections[using]
+    if connection.in_atomic_block or not hasattr(connection, 'transaction_mode'):
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # 只对开始事务计时：进入 atomic 时执行 BEGIN IMMEDIATE，等待写锁
+    atomic = transaction.atomic(using=using)
+    with connection.transaction_mode('IMMEDIATE'):
+        start = perf_counter_ns()
+        try:
+            atomic.__enter__()
+        finally:
+            on_wait(perf_counter_ns() - start)
+    with ExitStack() as stack:
+        stack.push(atomic)
+        yield
+
+
+# MARK: - 重试
+class Attempt:
+    def __init__(self, runner):
+        self.runner = runner
+        self.succeeded = False
+        self.error = None
+
+    def __enter__(self):
+        runner = self.runner
+        while True:
+            stack = ExitStack()
+            try:
+                stack.enter_context(begin_immediate(runner.using, runner.record_wait))
+            except Exception as e:
+                stack.__exit__(type(e), e, e.__traceback__)
+                # 语句块还未执行，开启事务时被锁可以直接重试
+                if runner.can_retry and is_retryable(e) and runner.backoff():
+                    continue
+                raise
+            self._stack = stack
+            return self
+
+    def __exit__(self, exc_type, exc, tb):
+        original = exc
+        try:
+            if self._stack.__exit__(exc_type, exc, tb):
+                exc = None
+        except Exception as e:
+            # 例如 COMMIT 时数据库被锁
+            exc = e
+
+        if exc is None:
+            self.succeeded = True
+            return True
+        if not isinstance(exc, Exception):
+            return False
+        if self.runner.can_retry and is_retryable(exc):
+            # 吞掉异常，由 attempts() 决定是否再试一次
+            self.error = exc
+            return True
+        if exc is original:
+            return False
+        raise exc
+
+
+class AtomicRunner:
+    """
+    带重试的事务。
+
+    最外层事务遇到数据库被锁等错误时，按带随机抖动的指数退避重试整个事务；
+    嵌套在其他事务中时只创建保存点，错误交给外层事务重试。
+    """
+
+    def __init__(self, name, using=None, retries=5, base_delay=0.01, max_delay=0.5):
+        self.name = name
+        self.using = using or DEFAULT_DB_ALIAS
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.can_retry = True
+        self.retry = 0
+
+    def record_wait(self, ns):
+        metrics.record(self.name, lock_wait_ms=ns / 1e6)
+
+    def backoff(self):
+        if self.retry >= self.retries:
+            metrics.record(self.name, failures=1)
+            return False
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** self.retry))
+        self.retry += 1
+        # 退避的等待时间单独统计，lock_wait_ms 只包含等待写锁的时间
+        metrics.record(self.name, retries=1, backoff_ms=delay * 1000)
+        time.sleep(delay)
+        return True
+
+    def attempts(self):
+        # 已在事务中时无法重试
+        self.can_retry = not connections[self.using].in_atomic_block
+        metrics.record(self.name, calls=1)
+        while True:
+            attempt = Attempt(self)
+            yield attempt
+            if attempt.succeeded or attempt.error is None:
+                return
+            if not self.backoff():
+                raise attempt.error
+
+
+def atomic_attempts(name, **kwargs):
+    """
+    with 语句无法重新执行自身，因此以循环的方式使用：
+
+        for attempt in atomic_attempts('create_student'):
+            with attempt:
+                ...
+    """
+    return AtomicRunner(name, **kwargs).attempts()
+
+
+def retry_atomic(func=None, *, name=None, **kwargs):
+    """
+    @transaction.atomic 的替代品，可以直接 @retry_atomic 或 @retry_atomic(retries=3)。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            for attempt in atomic_attempts(name or func.__qualname__, **kwargs):
+                with attempt:
+                    return func(*args, **kw)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -1,3 +1,55 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.db import connection, connections
+from django.test import TransactionTestCase
+
+from .models import Info, Student
+from .runner import metrics, retry_atomic
+
+THREADS = 8
+ITERATIONS = 25
+
+
+@retry_atomic(name='stress_increment', retries=50)
+def increment(pk):
+    # 先读后写：没有 BEGIN IMMEDIATE 时，并发事务升级写锁会直接报错
+    info = Info.objects.get(pk=pk)
+    info.age += 1
+    info.save(update_fields=['age'])
+    Student.objects.create(name='stress')
+
+
+class RetryAtomicStressTests(TransactionTestCase):
+    def test_concurrent_writes_are_not_lost(self):
+        self.assertEqual(connection.vendor, 'sqlite')
+        self.assertNotIn('memory', connection.settings_dict['NAME'])
+
+        pk = Info.objects.create(age=0).pk
+        errors = []
+        start = threading.Barrier(THREADS)
+
+        def work():
+            try:
+                # 不等待写锁，让竞争都走重试逻辑
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA busy_timeout = 0')
+                start.wait()
+                for _ in range(ITERATIONS):
+                    increment(pk)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=work) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Info.objects.get(pk=pk).age, THREADS * ITERATIONS)
+        self.assertEqual(Student.objects.count(), THREADS * ITERATIONS)
+        stats = metrics.snapshot()['stress_increment']
+        self.assertEqual(stats['failures'], 0)
+        self.assertGreater(stats['retries'], 0)
@@ -1,9 +1,11 @@
 from django.urls import path
-from .views import create_student, CreateStudent
+from .views import create_student, CreateStudent, bulk_enroll, create_student_savepoint
 
 app_name = 'transanction_demo'
 
 urlpatterns = [
     path('create/', create_student, name='create'),
-    path('createbv/', CreateStudent.as_view(), name='createBV')
+    path('createbv/', CreateStudent.as_view(), name='createBV'),
+    path('bulk-enroll/', bulk_enroll, name='bulk_enroll'),
+    path('create-savepoint/', create_student_savepoint, name='create_savepoint'),
 ]
@@ -1,12 +1,17 @@
 from .models import Student, Info, Address
-from django.http import HttpResponse
+from .enrollment import enroll
+from .runner import retry_atomic
+from django.http import HttpResponse, JsonResponse
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 from django.db import transaction
 
 
 class CreateStudent(View):
-    @transaction.atomic
+    # @transaction.atomic
+    @retry_atomic
     def get(self, request):
         student = Student.objects.create(name='张三')
 
@@ -18,7 +23,8 @@ class CreateStudent(View):
         return HttpResponse('Create success...')
 
 
-@transaction.atomic
+# @transaction.atomic
+@retry_atomic
 def create_student(request):
     student = Student.objects.create(name='张三')
     info = Info.objects.create(age=19)
@@ -27,6 +33,39 @@ def create_student(request):
 
     return HttpResponse('Create success...')
 
+
+# MARK: - 重试 + 保存点
+# 外层事务遇到数据库被锁时整体重试，内层保存点照常回滚
+@retry_atomic
+def create_student_savepoint(request):
+    student = Student.objects.create(name='张三')
+
+    # 回滚保存点
+    save_tag = transaction.savepoint()
+
+    try:
+        info = Info.objects.create(age=19)
+        # 引发错误
+        oh_my_god = int('abc')
+        address = Address.objects.create(home='北京')
+    except ValueError:
+        # 回滚到 save_tag 的位置
+        transaction.savepoint_rollback(save_tag)
+    else:
+        transaction.savepoint_commit(save_tag)
+
+    return HttpResponse('Create success...')
+
+# MARK: - 批量导入
+# 请求体为 CSV（Content-Type: text/csv，表头 name,age,home）
+# 或 JSON lines（Content-Type: application/x-ndjson），逐行流式读取
+@csrf_exempt
+@require_POST
+def bulk_enroll(request):
+    report = enroll(request, request.content_type)
+    return JsonResponse(report)
+
+
 # @transaction.atomic
 # def create_student(request):
 #     student = Student.objects.create(name='张三')